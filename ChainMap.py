@@ -30,4 +30,673 @@ Changed in version 3.10: Keyword arguments support was added.
 parents
 Property returning a new ChainMap containing all of the maps in the current instance except the first one. This is useful for skipping the first map in the search. Use cases are similar to those for the nonlocal keyword used in nested scopes. The use cases also parallel those for the built-in super() function. A reference to d.parents is equivalent to: ChainMap(*d.maps[1:]).
 
-'''
\ No newline at end of file
+'''
+'''
+VersionedDict and CachedChainMap
+In a deep chain, a lookup for a key that lives near the root, or is missing,
+checks every level. CachedChainMap remembers which map each key was found in.
+Later lookups go straight to that map.
+
+The index has to notice when an underlying map gains or loses a key.
+VersionedDict is a dict subclass that counts its mutations in a version
+attribute and tells the chains watching it which key was added or removed. The
+chain then drops just that key from its index. Bulk changes, such as update()
+or clear(), drop the whole index. Changes to values do not affect the index,
+because it records where a key is, not its value.
+
+Maps are still held by reference. Changes made through the chain, through
+another chain, or directly on a VersionedDict are all seen. A map that is not a
+VersionedDict can't report changes, so the chain checks it on every lookup, as
+ChainMap does. Put plain dicts near the front of the chain, or avoid them.
+Editing the maps list, or assigning a new one, clears the index.
+
+new_child() adds an empty VersionedDict by default. The child watches only
+that map and fills its index from its parent's, so a fresh scope under a warm
+parent does not rescan the whole chain, and a map shared by many scopes is
+watched only by the chains that hold it directly. Apart from copying the maps
+list, as ChainMap does, new_child() is O(1). Bulk changes pass down to the
+children without detaching them; editing a chain's maps list turns its
+children into chains of their own.
+
+>>> globals_ = VersionedDict(pi=3.14159, e=2.71828)
+>>> scope = CachedChainMap(globals_)
+>>> for _ in range(40):
+...     scope = scope.new_child()
+>>> scope['pi']
+3.14159
+>>> globals_['pi'] = 3
+>>> scope['pi']
+3
+'''
+
+import collections.abc
+import itertools
+import time
+import tracemalloc
+import weakref
+from collections import ChainMap
+
+_ALL = object()
+
+
+def _live(refs):
+    'Return the live objects of an id -> weakref.ref dict, dropping dead entries.'
+    found = []
+    for i, ref in list(refs.items()):
+        obj = ref()
+        if obj is None:
+            del refs[i]
+        else:
+            found.append(obj)
+    return found
+
+
+def _add_ref(refs, obj):
+    'Add a weak reference to obj, pruning dead entries at every power of two.'
+    n = len(refs)
+    if n >= 16 and not n & (n - 1):
+        _live(refs)
+    refs[id(obj)] = weakref.ref(obj)
+
+
+class VersionedDict(dict):
+    'dict that counts its mutations and reports added or removed keys to watchers.'
+
+    __slots__ = ('version', '_watchers', '__weakref__')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self._watchers = {}         # id -> weakref.ref(chain)
+
+    def _changed(self, key=_ALL):
+        self.version += 1
+        if key is not None:
+            for watcher in _live(self._watchers):
+                watcher._invalidate(key)
+
+    def __setitem__(self, key, value):
+        added = key not in self
+        super().__setitem__(key, value)
+        self._changed(key if added else None)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed(key)
+
+    def pop(self, key, *default):
+        present = key in self
+        value = super().pop(key, *default)
+        self._changed(key if present else None)
+        return value
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._changed(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        added = key not in self
+        value = super().setdefault(key, default)
+        self._changed(key if added else None)
+        return value
+
+    def update(self, *args, **kwargs):
+        size = len(self)
+        super().update(*args, **kwargs)
+        self._changed(_ALL if len(self) != size else None)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def copy(self):
+        return type(self)(self)
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+class _MapsList(list):
+    'The maps list of a CachedChainMap; any edit clears the chain\'s index.'
+
+    __slots__ = ('_owner',)
+
+    def _edited(self):
+        self._owner._maps_changed()
+
+
+def _editing(name):
+    method = getattr(list, name)
+
+    def edit(self, *args):
+        result = method(self, *args)
+        self._edited()
+        return result
+
+    edit.__name__ = name
+    return edit
+
+
+for _name in ('__setitem__', '__delitem__', '__iadd__', '__imul__', 'append',
+              'extend', 'insert', 'pop', 'remove', 'clear', 'reverse'):
+    setattr(_MapsList, _name, _editing(_name))
+del _name
+
+
+def _sort(self, *, key=None, reverse=False):
+    list.sort(self, key=key, reverse=reverse)
+    self._edited()
+
+
+_MapsList.sort = _sort
+
+
+class CachedChainMap(ChainMap):
+    'ChainMap that indexes which map holds each key.'
+
+    def __init__(self, *maps):
+        self._where = {}                # key -> position among the maps
+        self._unwatched = ()            # positions of maps that can't report changes
+        self._parent = None
+        self._children = {}             # id -> weakref.ref(child chain)
+        super().__init__(*maps)
+
+    @property
+    def maps(self):
+        return self._maps
+
+    @maps.setter
+    def maps(self, maps):
+        maps = _MapsList(maps)
+        maps._owner = self
+        self._maps = maps
+        self._maps_changed()
+
+    def _maps_changed(self):
+        self._watch_maps()
+        if self._parent is not None:
+            self._parent._children.pop(id(self), None)
+            self._parent = None
+        # The children copied the old maps list, so they no longer extend this
+        # chain; each becomes a chain of its own.
+        children = _live(self._children)
+        self._children.clear()
+        for child in children:
+            child._parent = None
+            child._watch_maps()
+            child._invalidate(_ALL)
+        self._invalidate(_ALL)
+
+    def _watch_maps(self):
+        unwatched = []
+        for pos, mapping in enumerate(self._maps):
+            if isinstance(mapping, VersionedDict):
+                _add_ref(mapping._watchers, self)
+            else:
+                unwatched.append(pos)
+        self._unwatched = tuple(unwatched)
+
+    def _invalidate(self, key):
+        # A child caches a key only if its parent does, so a key is passed on
+        # only to the children of chains that had it.
+        stack = [self]
+        while stack:
+            chain = stack.pop()
+            if key is _ALL:
+                chain._where.clear()
+            elif chain._where.pop(key, None) is None:
+                continue
+            if chain._children:
+                stack.extend(_live(chain._children))
+
+    def _watched_pos(self, key):
+        'Position of the first VersionedDict holding key, or len(maps).'
+        pos = self._where.get(key)
+        if pos is not None:
+            return pos
+        path = []
+        chain = self
+        while True:
+            pos = chain._where.get(key)
+            if pos is not None:
+                break
+            unwatched = chain._unwatched
+            if chain._parent is None:
+                for pos, mapping in enumerate(chain._maps):
+                    if key in mapping and pos not in unwatched:
+                        break
+                else:
+                    pos = len(chain._maps)
+                chain._where[key] = pos
+                break
+            if key in chain._maps[0] and not (unwatched and unwatched[0] == 0):
+                pos = chain._where[key] = 0
+                break
+            path.append(chain)
+            chain = chain._parent
+        for chain in reversed(path):
+            pos += 1
+            chain._where[key] = pos
+        return pos
+
+    def _find(self, key):
+        pos = self._watched_pos(key)
+        maps = self._maps
+        for p in self._unwatched:
+            if p >= pos:
+                break
+            if key in maps[p]:
+                return p
+        return pos
+
+    def __getitem__(self, key):
+        pos = self._find(key)
+        if pos < len(self._maps):
+            return self._maps[pos][key]
+        return self.__missing__(key)
+
+    def get(self, key, default=None):
+        pos = self._find(key)
+        return self._maps[pos][key] if pos < len(self._maps) else default
+
+    def __contains__(self, key):
+        return self._find(key) < len(self._maps)
+
+    def new_child(self, m=None, **kwargs):
+        if m is None:
+            m = VersionedDict(kwargs)
+        elif kwargs:
+            m.update(kwargs)
+        # The child watches only its own map and extends this chain's index,
+        # so it is not registered with every map below it.
+        cls = self.__class__
+        child = cls.__new__(cls)
+        child._where = {}
+        child._parent = self
+        child._children = {}
+        maps = child._maps = _MapsList((m, *self._maps))
+        maps._owner = child
+        if isinstance(m, VersionedDict):
+            _add_ref(m._watchers, child)
+            unwatched = ()
+        else:
+            unwatched = (0,)
+        child._unwatched = unwatched + tuple(pos + 1 for pos in self._unwatched)
+        _add_ref(self._children, child)
+        return child
+
+    def __reduce__(self):
+        return self.__class__, tuple(self._maps)
+
+
+'''
+PersistentMap and PersistentChainMap
+Taking an immutable snapshot of a ChainMap of dicts means copying every dict.
+PersistentMap is an immutable mapping stored as a hash array mapped trie
+(HAMT). set() and delete() return a new map that shares all untouched nodes
+with the original, so a modified copy costs O(log n) new nodes, not a copy of
+the data.
+
+PersistentChainMap is a ChainMap whose maps are PersistentMaps. Writes,
+updates and deletions still only affect the first mapping: they replace
+maps[0] with a modified copy. Nothing that another chain can see is changed.
+A plain mapping passed as the first map, to the constructor or to new_child(),
+is copied into a PersistentMap first, so the caller's dict is never written.
+copy() (also available as snapshot()) and new_child() copy only the list of
+map references, one pointer per level. The maps themselves are shared, so a
+snapshot of a whole scope chain is independent of how many keys it holds, and
+later writes to either chain never show through to the other.
+
+>>> base = PersistentChainMap(PersistentMap(user='ann', lang='en'))
+>>> scope = base.new_child(lang='fr')
+>>> frozen = scope.snapshot()
+>>> scope['lang'] = 'de'
+>>> frozen['lang'], scope['lang'], base['lang']
+('fr', 'de', 'en')
+'''
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_BITS = 64
+_SUB = object()             # key slot marking a sub-node in a node's entries
+
+
+def _hash(key):
+    return hash(key) & ((1 << _HASH_BITS) - 1)
+
+
+class _Node:
+    '''Bitmap-indexed trie node.
+
+    entries is a flat tuple (k0, v0, k1, v1, ...) with one pair per set bit of
+    bitmap, in bit order. A pair (_SUB, node) points to a sub-trie.
+    '''
+
+    __slots__ = ('bitmap', 'entries')
+
+    def __init__(self, bitmap, entries):
+        self.bitmap = bitmap
+        self.entries = entries
+
+    def get(self, h, shift, key, default):
+        bit = 1 << ((h >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return default
+        i = 2 * (self.bitmap & (bit - 1)).bit_count()
+        k = self.entries[i]
+        if k is _SUB:
+            return self.entries[i + 1].get(h, shift + _BITS, key, default)
+        if k is key or k == key:
+            return self.entries[i + 1]
+        return default
+
+    def assoc(self, h, shift, key, value):
+        'Return (new node, True if key was added).'
+        bit = 1 << ((h >> shift) & _MASK)
+        i = 2 * (self.bitmap & (bit - 1)).bit_count()
+        entries = self.entries
+        if not self.bitmap & bit:
+            return _Node(self.bitmap | bit, entries[:i] + (key, value) + entries[i:]), True
+        k, v = entries[i], entries[i + 1]
+        if k is _SUB:
+            node, added = v.assoc(h, shift + _BITS, key, value)
+            if node is v:
+                return self, False
+            return _Node(self.bitmap, entries[:i + 1] + (node,) + entries[i + 2:]), added
+        if k is key or k == key:
+            if v is value:
+                return self, False
+            return _Node(self.bitmap, entries[:i + 1] + (value,) + entries[i + 2:]), False
+        node = _pair(_hash(k), k, v, h, key, value, shift + _BITS)
+        return _Node(self.bitmap, entries[:i] + (_SUB, node) + entries[i + 2:]), True
+
+    def without(self, h, shift, key):
+        'Return the node without key, None if it becomes empty; KeyError if absent.'
+        bit = 1 << ((h >> shift) & _MASK)
+        if not self.bitmap & bit:
+            raise KeyError(key)
+        i = 2 * (self.bitmap & (bit - 1)).bit_count()
+        entries = self.entries
+        k, v = entries[i], entries[i + 1]
+        if k is _SUB:
+            node = v.without(h, shift + _BITS, key)
+            if node is not None:
+                if type(node) is _Node and len(node.entries) == 2 and node.entries[0] is not _SUB:
+                    # Pull a lone leaf up so the trie stays shallow.
+                    return _Node(self.bitmap, entries[:i] + node.entries + entries[i + 2:])
+                return _Node(self.bitmap, entries[:i + 1] + (node,) + entries[i + 2:])
+        elif not (k is key or k == key):
+            raise KeyError(key)
+        if self.bitmap == bit:
+            return None
+        return _Node(self.bitmap & ~bit, entries[:i] + entries[i + 2:])
+
+    def items(self):
+        entries = self.entries
+        for i in range(0, len(entries), 2):
+            if entries[i] is _SUB:
+                yield from entries[i + 1].items()
+            else:
+                yield entries[i], entries[i + 1]
+
+
+class _Collision:
+    'Leaf for keys whose full hashes are equal.'
+
+    __slots__ = ('hash', 'entries')
+
+    def __init__(self, h, entries):
+        self.hash = h
+        self.entries = entries
+
+    def _find(self, key):
+        entries = self.entries
+        for i in range(0, len(entries), 2):
+            if entries[i] is key or entries[i] == key:
+                return i
+        return -1
+
+    def get(self, h, shift, key, default):
+        i = self._find(key)
+        return default if i < 0 else self.entries[i + 1]
+
+    def assoc(self, h, shift, key, value):
+        i = self._find(key)
+        if i < 0:
+            return _Collision(self.hash, self.entries + (key, value)), True
+        return _Collision(self.hash, self.entries[:i + 1] + (value,) + self.entries[i + 2:]), False
+
+    def without(self, h, shift, key):
+        i = self._find(key)
+        if i < 0:
+            raise KeyError(key)
+        entries = self.entries[:i] + self.entries[i + 2:]
+        if len(entries) == 2:
+            return _Node(1 << ((self.hash >> shift) & _MASK), entries)
+        return _Collision(self.hash, entries)
+
+    def items(self):
+        entries = self.entries
+        for i in range(0, len(entries), 2):
+            yield entries[i], entries[i + 1]
+
+
+def _pair(h1, k1, v1, h2, k2, v2, shift):
+    'Return a node holding two keys that collided above shift.'
+    if shift >= _HASH_BITS or h1 == h2:
+        return _Collision(h1, (k1, v1, k2, v2))
+    i1 = (h1 >> shift) & _MASK
+    i2 = (h2 >> shift) & _MASK
+    if i1 == i2:
+        return _Node(1 << i1, (_SUB, _pair(h1, k1, v1, h2, k2, v2, shift + _BITS)))
+    if i1 < i2:
+        return _Node((1 << i1) | (1 << i2), (k1, v1, k2, v2))
+    return _Node((1 << i1) | (1 << i2), (k2, v2, k1, v1))
+
+
+_EMPTY_NODE = _Node(0, ())
+_NOTHING = object()
+
+
+class PersistentMap(collections.abc.Mapping):
+    'Immutable mapping; set() and delete() return structurally shared copies.'
+
+    __slots__ = ('_root', '_len', '_hashval')
+
+    def __new__(cls, other=(), /, **kwargs):
+        self = object.__new__(cls)
+        self._root = _EMPTY_NODE
+        self._len = 0
+        self._hashval = None
+        if other or kwargs:
+            self = self.update(other, **kwargs)
+        return self
+
+    @classmethod
+    def _make(cls, root, length):
+        self = object.__new__(cls)
+        self._root = root
+        self._len = length
+        self._hashval = None
+        return self
+
+    def __getitem__(self, key):
+        value = self._root.get(_hash(key), 0, key, _NOTHING)
+        if value is _NOTHING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        return self._root.get(_hash(key), 0, key, default)
+
+    def __contains__(self, key):
+        return self._root.get(_hash(key), 0, key, _NOTHING) is not _NOTHING
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return (key for key, value in self._root.items())
+
+    def items(self):
+        return _ItemsView(self)
+
+    def set(self, key, value):
+        root, added = self._root.assoc(_hash(key), 0, key, value)
+        if root is self._root:
+            return self
+        return self._make(root, self._len + added)
+
+    def delete(self, key):
+        root = self._root.without(_hash(key), 0, key)
+        return self._make(root or _EMPTY_NODE, self._len - 1)
+
+    def discard(self, key):
+        return self.delete(key) if key in self else self
+
+    def update(self, other=(), /, **kwargs):
+        root, length = self._root, self._len
+        pairs = other.items() if isinstance(other, collections.abc.Mapping) else other
+        for key, value in itertools.chain(pairs, kwargs.items()):
+            root, added = root.assoc(_hash(key), 0, key, value)
+            length += added
+        return self._make(root, length)
+
+    def copy(self):
+        return self
+
+    def __hash__(self):
+        if self._hashval is None:
+            self._hashval = hash(frozenset(self.items()))
+        return self._hashval
+
+    def __reduce__(self):
+        return type(self), (dict(self.items()),)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({dict(self.items())!r})'
+
+
+class _ItemsView(collections.abc.ItemsView):
+    def __iter__(self):
+        return self._mapping._root.items()
+
+
+class PersistentChainMap(ChainMap):
+    'ChainMap over PersistentMaps; copies and new_child() share all map data.'
+
+    def __init__(self, *maps):
+        super().__init__(*maps)
+        if not isinstance(self.maps[0], PersistentMap):
+            self.maps[0] = PersistentMap(self.maps[0])
+
+    def __setitem__(self, key, value):
+        self.maps[0] = self.maps[0].set(key, value)
+
+    def __delitem__(self, key):
+        try:
+            self.maps[0] = self.maps[0].delete(key)
+        except KeyError:
+            raise KeyError(f'Key not found in the first mapping: {key!r}')
+
+    def popitem(self):
+        try:
+            key = next(iter(self.maps[0]))
+        except StopIteration:
+            raise KeyError('No keys found in the first mapping.')
+        value = self.maps[0][key]
+        self.maps[0] = self.maps[0].delete(key)
+        return key, value
+
+    def pop(self, key, *args):
+        try:
+            value = self.maps[0][key]
+        except KeyError:
+            if args:
+                return args[0]
+            raise KeyError(f'Key not found in the first mapping: {key!r}')
+        self.maps[0] = self.maps[0].delete(key)
+        return value
+
+    def clear(self):
+        self.maps[0] = PersistentMap()
+
+    def update(self, other=(), /, **kwargs):
+        self.maps[0] = self.maps[0].update(other, **kwargs)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def new_child(self, m=None, **kwargs):
+        if m is None:
+            m = PersistentMap()
+        elif not isinstance(m, PersistentMap):
+            m = PersistentMap(m)
+        if kwargs:
+            m = m.update(kwargs)
+        return self.__class__(m, *self.maps)
+
+    def copy(self):
+        return self.__class__(*self.maps)
+
+    __copy__ = snapshot = copy
+
+
+def bench_chain_depth(depths=(1, 5, 10, 20, 50), lookups=10**5):
+    'Compare lookups of root, missing and local keys in ChainMap and CachedChainMap.'
+    for depth in depths:
+        for cls, root in ((ChainMap, dict), (CachedChainMap, VersionedDict)):
+            chain = cls(root((f'g{i}', i) for i in range(100)))
+            for level in range(depth - 1):
+                chain = chain.new_child({f'l{level}': level} if cls is ChainMap
+                                        else VersionedDict({f'l{level}': level}))
+            timings = []
+            for key in ('g50', 'missing', f'l{depth - 2}'):
+                t0 = time.perf_counter()
+                for _ in range(lookups):
+                    chain.get(key)
+                timings.append((time.perf_counter() - t0) / lookups * 1e9)
+            print(f'depth={depth:<3} {cls.__name__:>14}  root {timings[0]:6.0f} ns  '
+                  f'missing {timings[1]:6.0f} ns  local {timings[2]:6.0f} ns')
+
+
+def bench_scope_snapshots(scopes=5000, globals_size=10**4, depth=8, writes=5):
+    'Memory and time to keep an immutable snapshot of each of many render scopes.'
+    for kind in ('dict', 'persistent'):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        if kind == 'dict':
+            chain = ChainMap({f'g{i}': i for i in range(globals_size)})
+        else:
+            chain = PersistentChainMap(PersistentMap((f'g{i}', i) for i in range(globals_size)))
+        for level in range(depth - 1):
+            chain = chain.new_child()
+            chain[f'l{level}'] = level
+        base = tracemalloc.get_traced_memory()[0]
+        t1 = time.perf_counter()
+        snapshots = []
+        for n in range(scopes):
+            scope = chain.new_child()
+            for w in range(writes):
+                scope[f'x{w}'] = n
+            scope['g0'] = n
+            if kind == 'dict':
+                snapshots.append(ChainMap(*[dict(m) for m in scope.maps]))
+            else:
+                snapshots.append(scope.snapshot())
+        t2 = time.perf_counter()
+        used = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+        print(f'{kind:>10}: setup {(t1 - t0) * 1e3:7.1f} ms  {scopes} scope snapshots '
+              f'{(t2 - t1) * 1e3:8.1f} ms  {used / scopes:10.0f} bytes/scope')
+
+
+if __name__ == '__main__':
+    bench_chain_depth()
+    bench_scope_snapshots()
@@ -24,3 +24,696 @@ del c['sausage']                        # del actually removes the entry
 
 
 
+'''
+count_array and update_from_buffer
+Counter(iterable) counts one element at a time. For large arrays of small
+integers, bytes or strings, most of that time goes to the interpreter loop.
+count_array(data) returns the same Counter, but counts in bulk:
+
+- NumPy integer arrays whose values fit in a compact range use bincount;
+  other NumPy arrays (wide integers, floats, strings) use unique with counts.
+- bytes, bytearray and memoryview inputs are counted as byte values (or
+  as items of the memoryview's format). With NumPy they use bincount over
+  256 bins; without it they fall back to Counter's C counting loop.
+- Lists of ints are converted to a NumPy array and counted with bincount
+  when NumPy is available, and counted directly otherwise.
+
+Keys in the result are plain Python objects (int, str, float), and values that
+do not occur are absent, just as with Counter(iterable).
+
+update_from_buffer(counter, chunk) adds the counts of one chunk to an existing
+Counter, for streaming input. Only one update per distinct value is done in
+Python.
+
+>>> count_array(b'abracadabra')[ord('a')]
+5
+>>> c = Counter()
+>>> update_from_buffer(c, [3, 1, 3])
+>>> update_from_buffer(c, [3])
+>>> c
+Counter({3: 3, 1: 1})
+'''
+
+import array
+import bisect
+import collections.abc
+import concurrent.futures
+import heapq
+import itertools
+import marshal
+import math
+import numbers
+import os
+import sys
+import time
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_BINCOUNT_SLACK = 1 << 16
+
+
+def _count_numpy(a):
+    'Return (values, counts) as lists for a 1-D NumPy array.'
+    if a.dtype.kind in 'iu' and a.size:
+        lo, hi = int(a.min()), int(a.max())
+        if hi - lo <= 2 * a.size + _BINCOUNT_SLACK:
+            if a.dtype.kind == 'i':
+                offsets = a.astype(np.int64) - lo
+            else:
+                offsets = a - a.dtype.type(lo)
+            counts = np.bincount(offsets.astype(np.intp, copy=False))
+            nonzero = np.flatnonzero(counts)
+            return [lo + v for v in nonzero.tolist()], counts[nonzero].tolist()
+    values, counts = np.unique(a, return_counts=True)
+    return values.tolist(), counts.tolist()
+
+
+def _chunk_counts(data):
+    'Return a mapping of value -> count for one chunk of input.'
+    if np is not None:
+        if isinstance(data, np.ndarray):
+            a = data.ravel()
+        elif isinstance(data, (bytes, bytearray, memoryview, array.array)):
+            view = memoryview(data)
+            if view.format == 'c':
+                view = view.cast('B')
+            a = np.asarray(view).ravel()
+        elif isinstance(data, list) and data and all(type(x) is int for x in data[:64]):
+            a = np.asarray(data)
+            if a.dtype.kind not in 'iu':
+                return Counter(data)
+        else:
+            return Counter(data)
+        return dict(zip(*_count_numpy(a)))
+    if isinstance(data, (bytes, bytearray, memoryview, array.array)):
+        view = memoryview(data)
+        if view.ndim != 1 or view.format == 'c':
+            view = memoryview(view.tobytes()).cast('B' if view.format == 'c' else view.format)
+        return Counter(view)
+    return Counter(data)
+
+
+def count_array(data):
+    'Count the values in an array, buffer or list in bulk and return a Counter.'
+    counts = Counter()
+    update_from_buffer(counts, data)
+    return counts
+
+
+def update_from_buffer(counter, chunk):
+    'Add the counts of the values in chunk to counter, in place.'
+    counts = _chunk_counts(chunk)
+    if not counter and type(counter) is Counter:
+        dict.update(counter, counts)
+    else:
+        counter.update(counts)
+
+
+'''
+HeavyHitters
+A Counter keeps every distinct key forever. HeavyHitters is an approximate
+counter with a fixed memory footprint, for streams with too many distinct keys
+to hold. It supports c[key], update(), most_common(n), total() and merging
+with another HeavyHitters, so it can stand in for a Counter that is only used
+to find the most frequent elements.
+
+HeavyHitters(k=100, epsilon=1e-4, delta=1e-3) combines two structures:
+
+- A Count-Min sketch of depth ceil(ln(1/delta)) rows by width ceil(e/epsilon)
+  counters answers c[key] for any key. The estimate is never below the true
+  count, and with probability at least 1 - delta it exceeds it by at most
+  epsilon * N, where N is total().
+- A Space-Saving summary of k keys answers most_common(). Every key whose count
+  exceeds N/k is guaranteed to be in the summary, and a tracked count exceeds
+  the true count by at most the smallest tracked count (itself at most N/k).
+
+c[key] returns the smaller of the two estimates. Memory is fixed at
+width * depth 8-byte counters plus k summary entries, whatever the stream.
+
+Counts must be positive; unlike Counter, there is no subtraction or negative
+counts. Merged counters must be built with the same k, epsilon, delta and hash
+function. The default hash is the built-in hash(), which is salted per process
+for str and bytes; pass a stable hash function to merge counters built in
+different processes.
+
+>>> c = HeavyHitters(k=3)
+>>> c.update('abracadabra')
+>>> c.most_common(1)
+[('a', 5)]
+>>> c['a']
+5
+'''
+
+
+_UPDATE_CHUNK = 4096
+
+
+class HeavyHitters:
+    'Fixed-memory approximate counter: Count-Min sketch plus Space-Saving top-k.'
+
+    def __init__(self, k=100, epsilon=1e-4, delta=1e-3, hash=hash):
+        if k < 1:
+            raise ValueError('k must be at least 1')
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError('epsilon and delta must be between 0 and 1')
+        self.k = k
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self._hash = hash
+        self._rows = [array.array('q', bytes(8 * self.width)) for _ in range(self.depth)]
+        self._top = {}              # key -> Space-Saving count
+        self._heap = []             # (count, seq, key) entries, possibly stale
+        self._seq = 0               # tie-breaker, so keys are never compared
+        self._total = 0
+
+    def _columns(self, key):
+        h = self._hash(key)
+        h1 = h & 0xFFFFFFFF
+        h2 = ((h >> 32) ^ (h * 0x9E3779B1)) & 0xFFFFFFFF | 1
+        width = self.width
+        return [(h1 + i * h2) % width for i in range(self.depth)]
+
+    def _sketch(self, key):
+        return min(row[col] for row, col in zip(self._rows, self._columns(key)))
+
+    def __getitem__(self, key):
+        estimate = self._sketch(key)
+        tracked = self._top.get(key)
+        return estimate if tracked is None else min(estimate, tracked)
+
+    def __contains__(self, key):
+        return self[key] > 0
+
+    def add(self, key, count=1):
+        if count <= 0:
+            raise ValueError('HeavyHitters only supports positive counts')
+        for row, col in zip(self._rows, self._columns(key)):
+            row[col] += count
+        self._total += count
+        top = self._top
+        if key in top:
+            top[key] += count
+        elif len(top) < self.k:
+            top[key] = count
+            self._seq += 1
+            heapq.heappush(self._heap, (count, self._seq, key))
+            return
+        else:
+            floor = self._pop_min()
+            top[key] = floor + count
+        self._seq += 1
+        heapq.heappush(self._heap, (top[key], self._seq, key))
+        if len(self._heap) > 4 * self.k:
+            self._compact()
+
+    def _pop_min(self):
+        'Evict the key with the smallest tracked count and return that count.'
+        heap, top = self._heap, self._top
+        while True:
+            count, _, key = heapq.heappop(heap)
+            if top.get(key) == count:
+                del top[key]
+                return count
+
+    def _compact(self):
+        self._heap = [(count, seq, key)
+                      for seq, (key, count) in enumerate(self._top.items(), self._seq + 1)]
+        self._seq += len(self._heap)
+        heapq.heapify(self._heap)
+
+    def update(self, iterable=(), /, **kwargs):
+        if hasattr(iterable, 'items'):
+            for key, count in iterable.items():
+                self.add(key, count)
+        else:
+            # Items are counted in bounded chunks, so memory stays fixed however
+            # many distinct items the stream holds.
+            it = iter(iterable)
+            while chunk := Counter(itertools.islice(it, _UPDATE_CHUNK)):
+                for key, count in chunk.items():
+                    self.add(key, count)
+        for key, count in kwargs.items():
+            self.add(key, count)
+
+    def most_common(self, n=None):
+        'List the n most common tracked keys and their counts, most common first.'
+        if n is None:
+            return sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(n, self._top.items(), key=lambda item: item[1])
+
+    def total(self):
+        return self._total
+
+    def error_bound(self):
+        'Return the additive error bound (epsilon * N) on c[key].'
+        return self.epsilon * self._total
+
+    def keys(self):
+        return self._top.keys()
+
+    def __len__(self):
+        return len(self._top)
+
+    def _check_compatible(self, other):
+        if not isinstance(other, HeavyHitters):
+            return NotImplemented
+        if ((self.k, self.width, self.depth, self._hash)
+                != (other.k, other.width, other.depth, other._hash)):
+            raise ValueError('can only merge HeavyHitters with the same parameters')
+
+    def merge(self, other):
+        'Add the counts of other into self.'
+        if self._check_compatible(other) is NotImplemented:
+            raise TypeError('can only merge with another HeavyHitters')
+        for row, other_row in zip(self._rows, other._rows):
+            for col, value in enumerate(other_row):
+                if value:
+                    row[col] += value
+        # A key missing from a full summary may still have up to its minimum.
+        floor_self = min(self._top.values()) if len(self._top) >= self.k else 0
+        floor_other = min(other._top.values()) if len(other._top) >= other.k else 0
+        merged = {}
+        for key in self._top.keys() | other._top.keys():
+            merged[key] = self._top.get(key, floor_self) + other._top.get(key, floor_other)
+        self._top = dict(heapq.nlargest(self.k, merged.items(), key=lambda item: item[1]))
+        self._compact()
+        self._total += other._total
+        return self
+
+    def __iadd__(self, other):
+        return self.merge(other)
+
+    def __add__(self, other):
+        if not isinstance(other, HeavyHitters):
+            return NotImplemented
+        result = self.copy()
+        return result.merge(other)
+
+    def copy(self):
+        result = object.__new__(type(self))
+        result.__dict__.update(self.__dict__)
+        result._rows = [array.array('q', row) for row in self._rows]
+        result._top = dict(self._top)
+        result._heap = list(self._heap)
+        return result
+
+    def __sizeof__(self):
+        return (object.__sizeof__(self)
+                + sum(sys.getsizeof(row) for row in self._rows)
+                + sys.getsizeof(self._top) + sys.getsizeof(self._heap)
+                + len(self._heap) * sys.getsizeof((0, 0, 0)))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({dict(self.most_common(10))!r}, total={self._total})'
+
+
+'''
+parallel_count
+parallel_count(sources, workers=None, tokenize=None, chunk_bytes=1 << 24)
+counts a large corpus on several cores and returns one Counter. It is
+equivalent to
+
+    c = Counter()
+    for source in sources:
+        c.update(source)
+
+where each source is one of the following:
+
+- a file path (str or os.PathLike), whose elements are its lines without
+  the trailing newline, or the tokens tokenize(line) returns for each line;
+- a mapping, such as another Counter, whose counts are added as they are,
+  zero and negative counts included;
+- any other iterable, whose elements are counted.
+
+Files larger than chunk_bytes are split at line boundaries into several
+shards, and long iterables are split into shards of a million elements. Each
+shard is counted in a worker process. Results come back in a compact binary
+form, not as pickled dicts: str keys are packed into one NUL-separated UTF-8
+blob, int keys and counts into int64 arrays. Anything else, float counts
+included, is packed with marshal. Shard results are merged pairwise, in rounds, inside the pool (a tree
+reduction), so the parent process only unpacks the final result.
+
+Iterables are sent to the workers, so they and tokenize must be picklable.
+Pass workers=1 to count in the calling process.
+'''
+
+_ITEMS_PER_SHARD = 10**6
+_STR, _INT, _MARSHAL = b'S', b'I', b'M'
+
+
+def _pack(counts):
+    'Serialize a {key: count} dict into bytes.'
+    keys = list(counts)
+    values = list(counts.values())
+    try:
+        packed_counts = array.array('q', values).tobytes()
+    except (OverflowError, TypeError):
+        # Counts that don't fit int64, such as floats, are marshalled.
+        packed_counts = None
+    if packed_counts is not None and all(type(key) is str and '\0' not in key for key in keys):
+        blob = '\0'.join(keys).encode('utf-8', 'surrogatepass')
+        return _STR + len(keys).to_bytes(8, 'little') + packed_counts + blob
+    if packed_counts is not None and all(type(key) is int for key in keys):
+        try:
+            packed_keys = array.array('q', keys).tobytes()
+        except OverflowError:
+            pass
+        else:
+            return _INT + len(keys).to_bytes(8, 'little') + packed_counts + packed_keys
+    try:
+        return _MARSHAL + marshal.dumps((keys, values))
+    except ValueError:
+        raise TypeError('parallel_count supports str, bytes, int, float and '
+                        'tuple keys, and int or float counts') from None
+
+
+def _unpack(data):
+    'Inverse of _pack; returns a plain dict.'
+    tag, body = data[:1], memoryview(data)[1:]
+    if tag == _MARSHAL:
+        keys, values = marshal.loads(body)
+        return dict(zip(keys, values))
+    n = int.from_bytes(body[:8], 'little')
+    values = array.array('q')
+    values.frombytes(body[8:8 + 8 * n])
+    rest = body[8 + 8 * n:]
+    if tag == _STR:
+        keys = bytes(rest).decode('utf-8', 'surrogatepass').split('\0') if n else []
+    else:
+        keys = array.array('q')
+        keys.frombytes(rest)
+    return dict(zip(keys, values))
+
+
+def _add_into(target, counts):
+    'Add counts into the dict target, keeping zero and negative results.'
+    get = target.get
+    for key, count in counts.items():
+        target[key] = get(key, 0) + count
+
+
+def _count_file_range(path, start, end, tokenize, encoding):
+    counts = Counter()
+    with open(path, 'rb') as f:
+        if start:
+            f.seek(start - 1)
+            if f.read(1) != b'\n':
+                f.readline()
+        position = f.tell()
+        for raw in f:
+            if position >= end:
+                break
+            position += len(raw)
+            line = raw.decode(encoding).rstrip('\r\n') if raw.endswith(b'\n') else raw.decode(encoding)
+            counts.update(tokenize(line) if tokenize is not None else (line,))
+    return counts
+
+
+def _count_shard(task):
+    kind, payload = task[0], task[1:]
+    if kind == 'file':
+        counts = _count_file_range(*payload)
+    elif kind == 'mapping':
+        counts = dict(payload[0])
+    else:
+        counts = Counter(payload[0])
+    return _pack(counts)
+
+
+def _merge_packed(pair):
+    counts = _unpack(pair[0])
+    _add_into(counts, _unpack(pair[1]))
+    return _pack(counts)
+
+
+def _shards(sources, tokenize, chunk_bytes, encoding):
+    for source in sources:
+        if isinstance(source, (str, os.PathLike)):
+            size = os.path.getsize(source)
+            for start in range(0, max(size, 1), chunk_bytes):
+                yield ('file', source, start, min(start + chunk_bytes, size), tokenize, encoding)
+        elif isinstance(source, collections.abc.Mapping):
+            yield ('mapping', dict(source))
+        else:
+            it = iter(source)
+            while chunk := list(itertools.islice(it, _ITEMS_PER_SHARD)):
+                yield ('items', chunk)
+
+
+def parallel_count(sources, workers=None, tokenize=None, chunk_bytes=1 << 24,
+                   encoding='utf-8'):
+    'Count the elements of many sources in a process pool and return a Counter.'
+    tasks = _shards(sources, tokenize, chunk_bytes, encoding)
+    result = Counter()
+    if workers == 1:
+        for task in tasks:
+            _add_into(result, _unpack(_count_shard(task)))
+        return result
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        packed = list(pool.map(_count_shard, tasks))
+        while len(packed) > 1:
+            odd = [packed.pop()] if len(packed) % 2 else []
+            packed = list(pool.map(_merge_packed, zip(packed[0::2], packed[1::2]))) + odd
+    if packed:
+        dict.update(result, _unpack(packed[0]))
+    return result
+
+
+'''
+RankedCounter
+Counter.most_common(k) sorts or heap-selects over every key on each call.
+RankedCounter is a Counter subclass that also keeps its keys grouped by count:
+one bucket per distinct count value, plus a sorted list of those counts.
+most_common(k) walks the buckets from the highest count down and costs
+O(k + buckets visited). An increment or decrement moves one key between
+buckets. That is O(1) plus a bisect into the distinct counts, which are usually
+far fewer than the keys.
+
+It behaves like a Counter in every other respect, including zero and negative
+counts, which sit in their own buckets at the bottom of the ranking. The one
+difference: keys with equal counts are listed in the order in which they
+reached that count, not in the order first encountered. Counts must be
+ordered numbers: setting a count such as None, which Counter would store,
+raises TypeError and leaves the counter unchanged.
+
+>>> c = RankedCounter('abracadabra')
+>>> c.most_common(2)
+[('a', 5), ('b', 2)]
+>>> c['z'] -= 1
+>>> c.most_common()[-1]
+('z', -1)
+'''
+
+
+class RankedCounter(Counter):
+    'Counter that keeps keys bucketed by count for fast most_common().'
+
+    def __init__(self, iterable=None, /, **kwds):
+        self._buckets = {}          # count -> {key: None}, in arrival order
+        self._ranks = []            # distinct counts, ascending
+        super().__init__(iterable, **kwds)
+
+    def _leave(self, key, count):
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            del self._ranks[bisect.bisect_left(self._ranks, count)]
+
+    def _enter(self, key, count):
+        bucket = self._buckets.get(count)
+        if bucket is None:
+            bucket = self._buckets[count] = {}
+            bisect.insort(self._ranks, count)
+        bucket[key] = None
+
+    def __setitem__(self, key, count):
+        if type(count) is not int and not _is_count(count):
+            raise TypeError(f'RankedCounter counts must be numbers, not {type(count).__name__!r}')
+        old = dict.get(self, key, _ABSENT)
+        if old is not _ABSENT:
+            if old == count:
+                dict.__setitem__(self, key, count)
+                return
+            self._leave(key, old)
+        dict.__setitem__(self, key, count)
+        self._enter(key, count)
+
+    def __delitem__(self, key):
+        if key in self:
+            self._leave(key, dict.__getitem__(self, key))
+            dict.__delitem__(self, key)
+
+    def update(self, iterable=None, /, **kwds):
+        # Counter.update() copies a mapping into an empty counter with
+        # dict.update(), which would bypass the buckets.
+        if isinstance(iterable, collections.abc.Mapping):
+            for key, count in iterable.items():
+                self[key] = count + self.get(key, 0)
+            iterable = None
+        super().update(iterable, **kwds)
+
+    def pop(self, key, *default):
+        if key in self:
+            self._leave(key, dict.__getitem__(self, key))
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        key, count = dict.popitem(self)
+        self._leave(key, count)
+        return key, count
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def clear(self):
+        dict.clear(self)
+        self._buckets.clear()
+        self._ranks.clear()
+
+    def __ior__(self, other):
+        for key, count in other.items():
+            if count > self[key]:
+                self[key] = count
+        return self._keep_positive()
+
+    def __iand__(self, other):
+        for key, count in list(self.items()):
+            other_count = other[key]
+            if other_count < count:
+                self[key] = other_count
+        return self._keep_positive()
+
+    def most_common(self, n=None):
+        'List the n most common elements and their counts, most common first.'
+        if n is None:
+            n = len(self)
+        result = []
+        if n <= 0:
+            return result
+        buckets = self._buckets
+        for count in reversed(self._ranks):
+            for key in buckets[count]:
+                result.append((key, count))
+                if len(result) == n:
+                    return result
+        return result
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+
+_ABSENT = object()
+
+
+def _is_count(value):
+    'Whether value can be ranked as a count: a real number, or a Number such as Decimal.'
+    return isinstance(value, numbers.Real) or (
+        isinstance(value, numbers.Number) and not isinstance(value, numbers.Complex))
+
+
+def bench_count_array(n=10**7):
+    'Compare Counter(iterable) with count_array on ints, bytes and strings.'
+    import os
+    import random
+    inputs = {
+        'bytes': os.urandom(n),
+        'list of small ints': [random.randrange(1000) for _ in range(n // 10)],
+        'array of ints': array.array('q', (random.randrange(10**6) for _ in range(n // 10))),
+        'list of strings': [random.choice(('GET', 'POST', 'PUT', 'HEAD')) for _ in range(n // 10)],
+    }
+    if np is not None:
+        inputs['ndarray int32'] = np.random.randint(0, 10**5, n, dtype=np.int32)
+    for name, data in inputs.items():
+        t0 = time.perf_counter()
+        expected = Counter(data)
+        t1 = time.perf_counter()
+        got = count_array(data)
+        t2 = time.perf_counter()
+        assert got == expected
+        print(f'{name:>20}: Counter {(t1 - t0) * 1e3:8.1f} ms  '
+              f'count_array {(t2 - t1) * 1e3:8.1f} ms')
+
+
+def bench_heavy_hitters(n=10**6, universe=10**6, s=1.1, top=100,
+                        settings=((100, 1e-3), (1000, 1e-4), (1000, 1e-5))):
+    'Accuracy against memory for HeavyHitters compared with an exact Counter.'
+    import random
+    rng = random.Random(0)
+    cum = list(itertools.accumulate(1 / (r ** s) for r in range(1, universe + 1)))
+    stream = [f'url/{key}' for key in rng.choices(range(universe), cum_weights=cum, k=n)]
+    exact = Counter(stream)
+    exact_bytes = sys.getsizeof(exact) + sum(sys.getsizeof(key) for key in exact)
+    truth = [key for key, _ in exact.most_common(top)]
+    print(f'exact Counter: {len(exact)} keys, ~{exact_bytes / 2**20:.1f} MiB')
+    for k, epsilon in settings:
+        approx = HeavyHitters(k=k, epsilon=epsilon)
+        t0 = time.perf_counter()
+        for key in stream:
+            approx.add(key)
+        elapsed = time.perf_counter() - t0
+        found = {key for key, _ in approx.most_common(top)}
+        recall = len(found.intersection(truth)) / top
+        errors = [(approx[key] - exact[key]) / exact[key] for key in truth]
+        print(f'k={k:<5} epsilon={epsilon:<7} {sys.getsizeof(approx) / 2**20:7.2f} MiB  '
+              f'top-{top} recall {recall:.2f}  mean rel. error {sum(errors) / top:.4f}  '
+              f'max {max(errors):.4f}  {elapsed / n * 1e6:.2f} us/item')
+
+
+def bench_parallel_count(lines=2 * 10**6, files=8, max_workers=None):
+    'Time parallel_count over a word corpus with 1 to max_workers processes.'
+    import random
+    import tempfile
+    max_workers = max_workers or os.cpu_count()
+    rng = random.Random(0)
+    vocabulary = [f'w{i}' for i in range(50000)]
+    paths = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(files):
+            path = os.path.join(tmp, f'part{i}.txt')
+            with open(path, 'w') as f:
+                for _ in range(lines // files):
+                    f.write(' '.join(rng.choices(vocabulary, k=10)) + '\n')
+            paths.append(path)
+        baseline = None
+        workers = 1
+        while workers <= max_workers:
+            t0 = time.perf_counter()
+            parallel_count(paths, workers=workers, tokenize=str.split, chunk_bytes=1 << 22)
+            elapsed = time.perf_counter() - t0
+            baseline = baseline or elapsed
+            print(f'workers={workers:<3} {elapsed:7.2f} s  speedup {baseline / elapsed:5.2f}x')
+            workers *= 2
+
+
+def bench_ranked_counter(keys=10**5, updates=10**5, queries=10**3, k=10):
+    'Time updates and most_common(k) on RankedCounter against Counter.'
+    import random
+    rng = random.Random(0)
+    stream = [int(rng.paretovariate(1.0)) % keys for _ in range(updates)]
+    for cls in (Counter, RankedCounter):
+        c = cls(range(keys))
+        t0 = time.perf_counter()
+        for key in stream:
+            c[key] += 1
+        t1 = time.perf_counter()
+        for _ in range(queries):
+            c.most_common(k)
+        t2 = time.perf_counter()
+        print(f'{cls.__name__:>13}: increment {(t1 - t0) / updates * 1e9:6.0f} ns  '
+              f'most_common({k}) {(t2 - t1) / queries * 1e6:9.1f} us')
+
+
+if __name__ == '__main__':
+    bench_count_array()
+    bench_ranked_counter()
+    bench_heavy_hitters()
+    bench_parallel_count()
@@ -50,4 +50,570 @@ A regular dict can emulate OrderedDict’s od.move_to_end(k, last=True) with d[k
 A regular dict does not have an efficient equivalent for OrderedDict’s od.move_to_end(k, last=False) which moves the key and its associated value to the leftmost (first) position.
 
 Until Python 3.8, dict lacked a __reversed__() method.
-'''
\ No newline at end of file
+'''
+'''
+LRUCache
+The LRU cache recipe, finished. Entries live in an OrderedDict in recency
+order: a hit calls move_to_end(), and eviction calls popitem(last=False).
+
+LRUCache(maxsize=128, maxweight=None, weigher=None, ttl=None, shards=1)
+maxsize limits the number of entries. maxweight limits the total of
+weigher(key, value) over all entries, for example a byte size. Either limit may
+be None. ttl is the default lifetime of an entry in seconds. An expired entry is
+dropped the next time it is looked up, or when eviction reaches it.
+
+The cache is thread-safe. Each shard is its own OrderedDict with its own lock,
+and a key always maps to the same shard. With shards > 1, threads working on
+different shards do not contend. The limits apply per shard: maxsize is split
+so the shards' sizes add up to it (it must be at least shards), and each shard
+gets maxweight / shards, so an entry heavier than that share is not cached.
+Recency is tracked per shard too, so the eviction order is only approximately
+LRU overall. maxsize=0 caches nothing.
+
+get_or_compute(key, function) returns the cached value, or calls function()
+to produce it. Concurrent misses on the same key wait for a single call
+instead of computing the value several times. The function runs without
+holding the shard lock. If it raises, every waiting caller gets the exception
+and nothing is cached.
+
+cache_info() returns hits, misses, evictions, expirations, current size and
+weight.
+
+>>> cache = LRUCache(maxsize=2)
+>>> cache['a'] = 1
+>>> cache['b'] = 2
+>>> cache['a']
+1
+>>> cache['c'] = 3                      # evicts 'b', the least recently used
+>>> list(cache)
+['a', 'c']
+>>> cache.get_or_compute('d', lambda: 4)
+4
+'''
+
+import collections.abc
+import functools
+import itertools
+import operator
+import random
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses evictions expirations currsize currweight')
+
+
+class _Shard:
+    __slots__ = ('lock', 'entries', 'weight', 'maxsize', 'maxweight',
+                 'hits', 'misses', 'evictions', 'expirations')
+
+    def __init__(self, maxsize, maxweight):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()        # key -> (value, weight, expires)
+        self.weight = 0
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+
+class _Pending:
+    'A computation in flight that other callers can wait on.'
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = self.error = None
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    'Thread-safe LRU cache with size, weight and time-to-live limits.'
+
+    def __init__(self, maxsize=128, maxweight=None, weigher=None, ttl=None,
+                 shards=1, timer=time.monotonic):
+        if shards < 1:
+            raise ValueError('shards must be at least 1')
+        if maxweight is not None and weigher is None:
+            raise ValueError('maxweight requires a weigher')
+        if maxsize is not None:
+            if maxsize < 0:
+                raise ValueError('maxsize must not be negative')
+            if 0 < maxsize < shards:
+                raise ValueError('maxsize must be at least shards')
+        if maxweight is not None and maxweight < 0:
+            raise ValueError('maxweight must not be negative')
+        per_weight = None if maxweight is None else maxweight / shards
+        self._shards = [
+            _Shard(None if maxsize is None else maxsize // shards + (i < maxsize % shards),
+                   per_weight)
+            for i in range(shards)]
+        self._weigher = weigher
+        self._ttl = ttl
+        self._timer = timer
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+
+    def _shard(self, key):
+        shards = self._shards
+        return shards[hash(key) % len(shards)] if len(shards) > 1 else shards[0]
+
+    # -- lookups ------------------------------------------------------------
+
+    def _lookup(self, shard, key, count=True):
+        'Return the live value for key, or _MISSING. Caller holds the lock.'
+        entry = shard.entries.get(key, _MISSING)
+        if entry is _MISSING:
+            shard.misses += count
+            return _MISSING
+        value, weight, expires = entry
+        if expires is not None and expires <= self._timer():
+            del shard.entries[key]
+            shard.weight -= weight
+            shard.expirations += 1
+            shard.misses += count
+            return _MISSING
+        shard.entries.move_to_end(key)
+        shard.hits += count
+        return value
+
+    def get(self, key, default=None):
+        shard = self._shard(key)
+        with shard.lock:
+            value = self._lookup(shard, key)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            return entry is not None and (entry[2] is None or entry[2] > self._timer())
+
+    # -- updates ------------------------------------------------------------
+
+    def put(self, key, value, ttl=_MISSING):
+        ttl = self._ttl if ttl is _MISSING else ttl
+        weight = self._weigher(key, value) if self._weigher is not None else 1
+        expires = None if ttl is None else self._timer() + ttl
+        shard = self._shard(key)
+        with shard.lock:
+            old = shard.entries.pop(key, None)
+            if old is not None:
+                shard.weight -= old[1]
+            if shard.maxsize == 0 or (shard.maxweight is not None and weight > shard.maxweight):
+                return
+            shard.entries[key] = (value, weight, expires)
+            shard.weight += weight
+            self._evict(shard)
+
+    __setitem__ = put
+
+    def _evict(self, shard):
+        'Drop least recently used entries until the shard is within limits.'
+        entries = shard.entries
+        now = None
+        while ((shard.maxsize is not None and len(entries) > shard.maxsize)
+               or (shard.maxweight is not None and shard.weight > shard.maxweight)):
+            key, (value, weight, expires) = entries.popitem(last=False)
+            shard.weight -= weight
+            if expires is not None:
+                now = self._timer() if now is None else now
+                if expires <= now:
+                    shard.expirations += 1
+                    continue
+            shard.evictions += 1
+
+    def __delitem__(self, key):
+        shard = self._shard(key)
+        with shard.lock:
+            value, weight, expires = shard.entries.pop(key)
+            shard.weight -= weight
+
+    def pop(self, key, default=_MISSING):
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.pop(key, None)
+            if entry is not None:
+                shard.weight -= entry[1]
+                if entry[2] is None or entry[2] > self._timer():
+                    return entry[0]
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def clear(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.weight = 0
+
+    def get_or_compute(self, key, function, ttl=_MISSING):
+        'Return the cached value for key, calling function() once on a miss.'
+        shard = self._shard(key)
+        with shard.lock:
+            value = self._lookup(shard, key)
+        if value is not _MISSING:
+            return value
+        with self._pending_lock:
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                # An owner may have finished between our miss and now.
+                with shard.lock:
+                    value = self._lookup(shard, key, count=False)
+                    if value is not _MISSING:
+                        shard.misses -= 1
+                        shard.hits += 1
+                        return value
+                pending = self._pending[key] = _Pending()
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+        try:
+            pending.value = function()
+            self.put(key, pending.value, ttl)
+        except BaseException as exc:
+            pending.error = exc
+            raise
+        finally:
+            with self._pending_lock:
+                del self._pending[key]
+            pending.done.set()
+        return pending.value
+
+    # -- introspection ------------------------------------------------------
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def __iter__(self):
+        'Iterate over a snapshot of the keys, least recently used first.'
+        keys = []
+        for shard in self._shards:
+            with shard.lock:
+                keys.extend(shard.entries)
+        return iter(keys)
+
+    def cache_info(self):
+        totals = [0] * 6
+        for shard in self._shards:
+            with shard.lock:
+                counts = (shard.hits, shard.misses, shard.evictions,
+                          shard.expirations, len(shard.entries), shard.weight)
+            totals = [t + c for t, c in zip(totals, counts)]
+        return CacheInfo(*totals)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.cache_info()})'
+
+
+'''
+IndexedOrderedDict
+An ordered mapping with positional access. Besides the usual mapping methods,
+popitem(last=...), move_to_end() and reversed(), it offers:
+
+item_at(k)                  the (key, value) pair at position k
+index_of(key)               the position of key
+insert_at(k, key, value)    insert a new key at position k
+
+Keys are kept in order in a list of short blocks, plus a tree of block
+lengths, so all three are O(log n) plus a scan within one bounded block. Key
+lookups use a dict and stay O(1).
+
+Equality follows OrderedDict: comparing two ordered mappings checks order, and
+comparing with a regular mapping does not.
+
+>>> d = IndexedOrderedDict.fromkeys('abcde')
+>>> d.item_at(-1)
+('e', None)
+>>> d.index_of('c')
+2
+>>> d.insert_at(1, 'x', 0)
+>>> ''.join(d)
+'axbcde'
+'''
+
+_LOAD = 256
+
+
+class _Block(list):
+    'Keys of one block. pos is its index in the block list, kept lazily.'
+
+    __slots__ = ('pos',)
+
+
+class IndexedOrderedDict(collections.abc.MutableMapping):
+    'Ordered mapping with O(log n) positional access and rank lookup.'
+
+    def __init__(self, other=(), /, **kwargs):
+        self._map = {}                  # key -> [value, block]
+        self._blocks = [_Block()]
+        self._tree = None
+        self._size = 0
+        self.update(other, **kwargs)
+
+    @classmethod
+    def fromkeys(cls, iterable, value=None):
+        self = cls()
+        for key in iterable:
+            self[key] = value
+        return self
+
+    # -- block index --------------------------------------------------------
+
+    def _build_index(self):
+        blocks = self._blocks
+        for pos, block in enumerate(blocks):
+            block.pos = pos
+        size = 1
+        while size < len(blocks):
+            size *= 2
+        tree = [0] * size
+        tree.extend(map(len, blocks))
+        tree.extend([0] * (size - len(blocks)))
+        for i in range(size - 1, 0, -1):
+            tree[i] = tree[2 * i] + tree[2 * i + 1]
+        self._tree = tree
+        self._size = size
+
+    def _bump(self, block, delta):
+        if self._tree is not None:
+            i = block.pos + self._size
+            while i:
+                self._tree[i] += delta
+                i >>= 1
+
+    def _locate(self, k):
+        'Return (block, offset) for position k, which must be in range.'
+        if self._tree is None:
+            self._build_index()
+        tree, size = self._tree, self._size
+        node = 1
+        while node < size:
+            node *= 2
+            if k >= tree[node]:
+                k -= tree[node]
+                node += 1
+        return self._blocks[node - size], k
+
+    def _start_of(self, block):
+        'Return the position of the first key in block.'
+        if self._tree is None:
+            self._build_index()
+        tree = self._tree
+        node = block.pos + self._size
+        start = 0
+        while node > 1:
+            if node & 1:
+                start += tree[node - 1]
+            node >>= 1
+        return start
+
+    def _position(self, k):
+        k = operator.index(k)
+        n = len(self._map)
+        if k < 0:
+            k += n
+        if not 0 <= k < n:
+            raise IndexError('position out of range')
+        return k
+
+    def _split(self, block):
+        half = len(block) // 2
+        right = _Block(block[half:])
+        del block[half:]
+        for key in right:
+            self._map[key][1] = right
+        if self._tree is None:
+            self._build_index()
+        self._blocks.insert(block.pos + 1, right)
+        self._tree = None
+
+    def _unlink(self, key):
+        'Remove key from its block and return its value.'
+        value, block = self._map.pop(key)
+        block.remove(key)
+        self._bump(block, -1)
+        if not block and len(self._blocks) > 1:
+            if self._tree is None:
+                self._build_index()
+            del self._blocks[block.pos]
+            self._tree = None
+        return value
+
+    # -- mapping protocol ---------------------------------------------------
+
+    def __getitem__(self, key):
+        return self._map[key][0]
+
+    def __setitem__(self, key, value):
+        entry = self._map.get(key)
+        if entry is not None:
+            entry[0] = value
+            return
+        block = self._blocks[-1]
+        if len(block) >= _LOAD:
+            block = _Block()
+            self._blocks.append(block)
+            self._tree = None
+        block.append(key)
+        self._map[key] = [value, block]
+        self._bump(block, 1)
+
+    def __delitem__(self, key):
+        self._unlink(key)
+
+    def __contains__(self, key):
+        return key in self._map
+
+    def __len__(self):
+        return len(self._map)
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._blocks)
+
+    def __reversed__(self):
+        return itertools.chain.from_iterable(map(reversed, reversed(self._blocks)))
+
+    def clear(self):
+        self._map.clear()
+        self._blocks = [_Block()]
+        self._tree = None
+
+    def copy(self):
+        return type(self)(self)
+
+    __copy__ = copy
+
+    def __reduce__(self):
+        return type(self), (list(self.items()),)
+
+    def __eq__(self, other):
+        if isinstance(other, (IndexedOrderedDict, OrderedDict)):
+            return (len(self) == len(other)
+                    and all(map(operator.eq, self.items(), other.items())))
+        if isinstance(other, collections.abc.Mapping):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self.items())!r})'
+
+    # -- ordering operations ------------------------------------------------
+
+    def popitem(self, last=True):
+        if not self._map:
+            raise KeyError('dictionary is empty')
+        key = self._blocks[-1][-1] if last else self._blocks[0][0]
+        return key, self._unlink(key)
+
+    def move_to_end(self, key, last=True):
+        value = self._unlink(key)
+        if last:
+            self[key] = value
+        else:
+            self.insert_at(0, key, value)
+
+    # -- positional operations ----------------------------------------------
+
+    def item_at(self, k):
+        block, offset = self._locate(self._position(k))
+        key = block[offset]
+        return key, self._map[key][0]
+
+    def key_at(self, k):
+        block, offset = self._locate(self._position(k))
+        return block[offset]
+
+    def index_of(self, key):
+        block = self._map[key][1]
+        start = self._start_of(block)
+        return start + block.index(key)
+
+    def insert_at(self, k, key, value):
+        if key in self._map:
+            raise KeyError(f'{key!r} is already present')
+        k = operator.index(k)
+        n = len(self._map)
+        if k < 0:
+            k = max(k + n, 0)
+        if k >= n:
+            self[key] = value
+            return
+        block, offset = self._locate(k)
+        block.insert(offset, key)
+        self._map[key] = [value, block]
+        self._bump(block, 1)
+        if len(block) > 2 * _LOAD:
+            self._split(block)
+
+
+def zipf_keys(n, universe, s=1.1, seed=0):
+    'Return n keys drawn from range(universe) with Zipfian popularity.'
+    rng = random.Random(seed)
+    cum = list(itertools.accumulate(1 / (k ** s) for k in range(1, universe + 1)))
+    return rng.choices(range(universe), cum_weights=cum, k=n)
+
+
+def bench_lru_cache(n=10**6, universe=10**5, maxsize=10**4, skews=(0.8, 1.1, 1.4)):
+    'Compare LRUCache.get_or_compute with functools.lru_cache on Zipfian keys.'
+    def compute(key):
+        return key
+
+    for s in skews:
+        keys = zipf_keys(n, universe, s)
+        cached = functools.lru_cache(maxsize)(compute)
+        t0 = time.perf_counter()
+        for k in keys:
+            cached(k)
+        t1 = time.perf_counter()
+        info = cached.cache_info()
+        lru_hit = info.hits / n
+        for shards in (1, 8):
+            cache = LRUCache(maxsize, shards=shards)
+            t2 = time.perf_counter()
+            for k in keys:
+                cache.get_or_compute(k, lambda k=k: compute(k))
+            t3 = time.perf_counter()
+            ours = cache.cache_info()
+            print(f's={s}  functools.lru_cache {(t1 - t0) / n * 1e9:7.0f} ns/op '
+                  f'hit {lru_hit:.3f}  |  LRUCache(shards={shards}) '
+                  f'{(t3 - t2) / n * 1e9:7.0f} ns/op hit {ours.hits / n:.3f}')
+
+
+def bench_indexed_ordered_dict(sizes=(10**4, 10**5, 10**6), ops=1000):
+    'Compare positional access on IndexedOrderedDict with scanning an OrderedDict.'
+    for n in sizes:
+        od = OrderedDict.fromkeys(range(n))
+        iod = IndexedOrderedDict.fromkeys(range(n))
+        positions = random.Random(0).choices(range(n), k=ops)
+        t0 = time.perf_counter()
+        for k in positions:
+            next(itertools.islice(od.items(), k, None))
+        t1 = time.perf_counter()
+        for k in positions:
+            iod.item_at(k)
+        t2 = time.perf_counter()
+        for k in positions:
+            iod.index_of(k)
+        t3 = time.perf_counter()
+        print(f'n={n:<8} OrderedDict scan {(t1 - t0) / ops * 1e6:9.1f} us  '
+              f'item_at {(t2 - t1) / ops * 1e6:6.2f} us  '
+              f'index_of {(t3 - t2) / ops * 1e6:6.2f} us')
+
+
+if __name__ == '__main__':
+    bench_lru_cache()
+    bench_indexed_ordered_dict()
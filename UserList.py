@@ -15,4 +15,105 @@ A real list object used to store the contents of the UserList class.
 Subclassing requirements: Subclasses of UserList are expected to offer a constructor which can be called with either no arguments or one argument. List operations which return a new sequence attempt to create an instance of the actual implementation class. To do so, it assumes that the constructor can be called with a single parameter, which is a sequence object used as a data source.
 
 If a derived class does not wish to comply with this requirement, all of the special methods supported by this class will need to be overridden; please consult the sources for information about the methods which need to be provided in that case.
-'''
\ No newline at end of file
+'''
+
+'''
+InstrumentedUserList
+The list counterpart of InstrumentedUserDict in UserDict.py, with the same
+stats attribute, sampling settings, snapshot() and export_stats(). It counts
+every sequence operation, samples latencies, and records how len(data) grows.
+
+Latency samples record the list's length at the time, so the snapshot shows
+misuse directly: a high mean_size for __contains__, index, count or remove
+means linear scans over a big list, and many copy calls show repeated
+copying. Iteration is served from data directly and counted once per loop,
+not once per item as the inherited Sequence.__iter__ would.
+
+>>> lst = InstrumentedUserList(range(1000))
+>>> lst.stats.configure(sample_every=1)
+>>> 999 in lst
+True
+>>> snap = lst.stats.snapshot()
+>>> snap['calls']['__contains__'], snap['latency']['__contains__']['mean_size']
+(1, 1000.0)
+'''
+
+import collections
+import time
+
+from UserDict import _creation_site, _register, instrument_class
+
+
+class InstrumentedUserList(collections.UserList):
+    'UserList that counts, samples and times its operations.'
+
+    sample_every = 64
+    size_every = 256
+    max_history = 128
+    _stats = None
+    _site = None
+
+    def __init__(self, initlist=None):
+        self._site = _creation_site()
+        super().__init__(initlist)
+
+    @property
+    def stats(self):
+        'The OperationStats of this list, created on first use.'
+        return self._stats or _register(self, 'UserList')
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __reversed__(self):
+        return reversed(self.data)
+
+    def __copy__(self):
+        return type(self)(self.data)
+
+    def __reduce__(self):
+        # Copies and unpickled objects start with fresh statistics.
+        return type(self), (self.data,)
+
+
+instrument_class(
+    InstrumentedUserList,
+    ('__getitem__', '__setitem__', '__delitem__', '__contains__', '__iter__', '__reversed__',
+     '__len__', '__add__', '__radd__', '__iadd__', '__mul__', '__rmul__', '__imul__',
+     '__eq__', '__lt__', '__le__', '__gt__', '__ge__', 'append', 'insert', 'pop', 'remove',
+     'clear', 'copy', '__copy__', 'count', 'index', 'reverse', 'sort', 'extend'),
+    mutating=('__setitem__', '__delitem__', '__iadd__', '__imul__', 'append', 'insert',
+              'pop', 'remove', 'clear', 'extend'),
+    inline={'__getitem__': '_result = self.data[i] if type(i) is int else method(self, i)',
+            '__contains__': '_result = item in self.data',
+            '__len__': '_result = len(self.data)',
+            'append': 'self.data.append(item); _result = None',
+            'pop': '_result = self.data.pop(i)'},
+)
+
+
+def bench_instrumented_user_list(n=10**6):
+    'Compare UserList with InstrumentedUserList at several sampling intervals.'
+    for name, sample_every in (('UserList', None), ('sample_every=1', 1),
+                               ('sample_every=64', 64), ('sample_every=0', 0)):
+        if sample_every is None:
+            lst = collections.UserList()
+        else:
+            lst = InstrumentedUserList()
+            lst.stats.configure(sample_every=sample_every)
+        t0 = time.perf_counter()
+        for i in range(n):
+            lst.append(i)
+        t1 = time.perf_counter()
+        for i in range(n):
+            lst[i]
+        t2 = time.perf_counter()
+        for _ in lst:
+            pass
+        t3 = time.perf_counter()
+        print(f'{name:>16} append {(t1 - t0) / n * 1e9:6.0f} ns  getitem {(t2 - t1) / n * 1e9:6.0f} ns  '
+              f'iterate {(t3 - t2) / n * 1e9:6.0f} ns/item')
+
+
+if __name__ == '__main__':
+    bench_instrumented_user_list()
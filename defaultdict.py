@@ -25,4 +25,229 @@ default_factory
 This attribute is used by the __missing__() method; it is initialized from the first argument to the constructor, if present, or to None, if absent.
 
 Changed in version 3.9: Added merge (|) and update (|=) operators, specified in PEP 584.
-'''
\ No newline at end of file
+'''
+'''
+GroupAccumulator
+The usual grouping idiom,
+
+    groups = defaultdict(list)
+    for key, value in rows:
+        groups[key].append(value)
+
+allocates a list per key and keeps one boxed object per value.
+GroupAccumulator supports the same groups[key].append(value) ergonomics, but
+stores all values in a single typed column (an array.array of typecode) next
+to a column of small integer group codes. Memory per row is the item size of
+typecode plus 4 bytes for the code, whatever the number of groups. The object
+returned by groups[key] is created once per key, like the list a defaultdict
+would create. Appending through it only writes to the two columns.
+
+The aggregations sum(), count(), min(), max() and mean() return a dict mapping
+each key to its result. With NumPy installed, they run as one vectorized pass
+over the columns (bincount and ufunc.reduceat). Otherwise they run as a single
+loop. values(key) returns one group's values as an array. A group that was
+looked up but never appended to has a sum of 0 and a count of 0, and is left
+out of min(), max() and mean().
+
+>>> groups = GroupAccumulator('d')
+>>> for city, temp in [('oslo', 3.0), ('rome', 18.0), ('oslo', 5.0)]:
+...     groups[city].append(temp)
+>>> groups.mean()
+{'oslo': 4.0, 'rome': 18.0}
+>>> groups.count()
+{'oslo': 2, 'rome': 1}
+'''
+
+import array
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class _Group:
+    'Append-only handle on one group of a GroupAccumulator.'
+
+    __slots__ = ('_owner', '_code')
+
+    def __init__(self, owner, code):
+        self._owner = owner
+        self._code = code
+
+    def append(self, value):
+        owner = self._owner
+        owner._values.append(value)
+        owner._codes.append(self._code)
+        owner._counts[self._code] += 1
+
+    def extend(self, values):
+        owner = self._owner
+        # Converted first, so a bad or failing input leaves both columns as they were.
+        values = array.array(owner.typecode, values)
+        added = len(values)
+        owner._values.extend(values)
+        owner._codes.extend(array.array('i', [self._code]) * added)
+        owner._counts[self._code] += added
+
+    def __len__(self):
+        return self._owner._counts[self._code]
+
+    def __iter__(self):
+        return iter(self._owner.values(self._owner._keys[self._code]))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._owner.values(self._owner._keys[self._code]).tolist()!r})'
+
+
+class GroupAccumulator:
+    'Group values by key into typed columns, then aggregate per group.'
+
+    def __init__(self, typecode='d'):
+        self.typecode = typecode
+        self._values = array.array(typecode)
+        self._codes = array.array('i')
+        self._groups = {}           # key -> _Group
+        self._keys = []             # code -> key
+        self._counts = []           # code -> number of rows
+
+    def __missing__(self, key):
+        group = self._groups[key] = _Group(self, len(self._keys))
+        self._keys.append(key)
+        self._counts.append(0)
+        return group
+
+    def __getitem__(self, key):
+        group = self._groups.get(key)
+        return self.__missing__(key) if group is None else group
+
+    def add(self, key, value):
+        self[key].append(value)
+
+    def extend(self, keys, values):
+        'Append values[i] to the group of keys[i] for each i.'
+        for key, value in zip(keys, values):
+            self[key].append(value)
+
+    def __contains__(self, key):
+        return key in self._groups
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def keys(self):
+        return self._groups.keys()
+
+    def rows(self):
+        return len(self._values)
+
+    def __sizeof__(self):
+        return (object.__sizeof__(self) + sys.getsizeof(self._values)
+                + sys.getsizeof(self._codes) + sys.getsizeof(self._groups)
+                + sys.getsizeof(self._keys) + sys.getsizeof(self._counts)
+                + len(self._keys) * sys.getsizeof(_Group(None, 0)))
+
+    # -- aggregation ----------------------------------------------------------
+
+    def _arrays(self):
+        return (np.frombuffer(self._codes, dtype=np.intc),
+                np.frombuffer(self._values, dtype=self._values.typecode))
+
+    def values(self, key):
+        'Return the values of one group, in insertion order, as an array.'
+        code = self._groups[key]._code
+        if np is not None:
+            codes, values = self._arrays()
+            return array.array(self.typecode, values[codes == code].tobytes())
+        return array.array(self.typecode,
+                           (v for c, v in zip(self._codes, self._values) if c == code))
+
+    def count(self):
+        return dict(zip(self._keys, self._counts))
+
+    def sum(self):
+        if np is not None:
+            codes, values = self._arrays()
+            if values.dtype.kind == 'f':
+                sums = np.bincount(codes, weights=values, minlength=len(self._keys)).tolist()
+            else:
+                sums = [0] * len(self._keys)
+                for code, total in zip(*self._reduce(np.add)):
+                    sums[code] = total
+            return dict(zip(self._keys, sums))
+        sums = [0] * len(self._keys)
+        for code, value in zip(self._codes, self._values):
+            sums[code] += value
+        return dict(zip(self._keys, sums))
+
+    def mean(self):
+        return {key: total / count
+                for (key, total), count in zip(self.sum().items(), self._counts)
+                if count}
+
+    def min(self):
+        return self._extreme(np.minimum if np is not None else None, min)
+
+    def max(self):
+        return self._extreme(np.maximum if np is not None else None, max)
+
+    def _reduce(self, ufunc):
+        'Return (codes, results) of ufunc.reduceat over the rows sorted by group.'
+        codes, values = self._arrays()
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        return sorted_codes[starts].tolist(), ufunc.reduceat(values[order], starts).tolist()
+
+    def _extreme(self, ufunc, builtin):
+        if not self._values:
+            return {}
+        if ufunc is not None:
+            return {self._keys[code]: value for code, value in zip(*self._reduce(ufunc))}
+        best = {}
+        for code, value in zip(self._codes, self._values):
+            current = best.get(code)
+            best[code] = value if current is None else builtin(current, value)
+        return {self._keys[code]: value for code, value in sorted(best.items())}
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.typecode!r}, groups={len(self)}, rows={self.rows()})'
+
+
+def bench_group_accumulator(rows=10**6, groups=10**3):
+    'Compare memory and aggregation time with defaultdict(list).'
+    import random
+    import tracemalloc
+    from collections import defaultdict
+    key_rng = random.Random(1)
+    keys = [f'k{key_rng.randrange(groups)}' for _ in range(rows)]
+    for name in ('defaultdict(list)', 'GroupAccumulator'):
+        rng = random.Random(0)
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        if name == 'GroupAccumulator':
+            g = GroupAccumulator('d')
+        else:
+            g = defaultdict(list)
+        for key in keys:
+            g[key].append(rng.random())         # a fresh value per row, as when parsing
+        t1 = time.perf_counter()
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        if name == 'GroupAccumulator':
+            g.sum(), g.min(), g.max(), g.mean()
+        else:
+            {k: sum(v) for k, v in g.items()}, {k: min(v) for k, v in g.items()}
+            {k: max(v) for k, v in g.items()}, {k: sum(v) / len(v) for k, v in g.items()}
+        t2 = time.perf_counter()
+        print(f'{name:>18}: build {t1 - t0:6.2f} s  aggregate {t2 - t1:6.3f} s  '
+              f'{used / rows:6.1f} bytes/row')
+
+
+if __name__ == '__main__':
+    bench_group_accumulator()
@@ -199,4 +199,1269 @@ def delete_nth(d, n):
 To implement deque slicing, use a similar approach applying rotate() to bring a target element to the left side of the deque. Remove old entries with popleft(), add new entries with extend(), and then reverse the rotation. With minor variations on that approach, it is easy to implement Forth style stack manipulations such as dup, drop, swap, over, pick, rot, and roll.
 
 
-'''
\ No newline at end of file
+'''
+'''
+BlockDeque
+A deque variant for workloads that index, replace, insert or delete in the middle.
+
+Items are kept in a list of short blocks (each one a collections.deque), plus a
+lazily built tree of block lengths. Operations at either end touch only the end
+blocks and stay O(1). Positional access walks the tree to find the block in
+O(log n), then indexes into a block of bounded size. Inserts and deletes in the
+middle only move items within one block.
+
+maxlen behaves as it does for deque: a full bounded BlockDeque discards from the
+opposite end on append/extend, and insert() raises IndexError.
+
+Slices work as they do for lists: d[i:j] copies only the selected range into a
+new BlockDeque, del d[i:j] and d[i:j] = iterable rebuild only the blocks that
+the range touches. Assigning a slice that would grow a bounded deque past
+maxlen raises IndexError. d.view(i, j) returns a read-only window over the
+deque that copies nothing and reads through to the live data.
+
+>>> d = BlockDeque(range(10), maxlen=8)
+>>> d
+BlockDeque([2, 3, 4, 5, 6, 7, 8, 9], maxlen=8)
+>>> d[3]
+5
+>>> del d[3]
+>>> d.insert(3, 'x')
+>>> d[3]
+'x'
+>>> d[2:5]
+BlockDeque([4, 'x', 6], maxlen=8)
+>>> d[2:5] = 'ab'
+>>> list(d.view(1, 4))
+[3, 'a', 'b']
+'''
+
+import array
+import asyncio
+import collections
+import collections.abc
+import concurrent.futures
+import itertools
+import math
+import mmap
+import operator
+import os
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_BLOCKLEN = 512
+
+
+class BlockDeque:
+    'Double-ended queue with O(1) ends and O(log n) positional access.'
+
+    def __init__(self, iterable=(), maxlen=None):
+        if maxlen is not None:
+            maxlen = operator.index(maxlen)
+            if maxlen < 0:
+                raise ValueError('maxlen must be non-negative')
+        self._maxlen = maxlen
+        self._blocks = [collections.deque()]
+        self._len = 0
+        self._index = None
+        self._size = 0
+        self.extend(iterable)
+
+    @property
+    def maxlen(self):
+        return self._maxlen
+
+    # -- positional index over block lengths --------------------------------
+
+    def _build_index(self):
+        blocks = self._blocks
+        size = 1
+        while size < len(blocks):
+            size *= 2
+        tree = [0] * size
+        tree.extend(len(b) for b in blocks)
+        tree.extend([0] * (size - len(blocks)))
+        for i in range(size - 1, 0, -1):
+            tree[i] = tree[2 * i] + tree[2 * i + 1]
+        self._index = tree
+        self._size = size
+
+    def _bump(self, k, delta):
+        'Adjust the recorded length of block k, if the index is live.'
+        tree = self._index
+        if tree is not None:
+            i = k + self._size
+            while i:
+                tree[i] += delta
+                i >>= 1
+
+    def _locate(self, i):
+        'Return (block number, offset in block) for a non-negative position.'
+        blocks = self._blocks
+        first = len(blocks[0])
+        if i < first:
+            return 0, i
+        last = len(blocks[-1])
+        if i >= self._len - last:
+            return len(blocks) - 1, i - (self._len - last)
+        if self._index is None:
+            self._build_index()
+        tree = self._index
+        size = self._size
+        node = 1
+        while node < size:
+            node *= 2
+            if i >= tree[node]:
+                i -= tree[node]
+                node += 1
+        return node - size, i
+
+    def _slice(self, s):
+        'Normalize a slice to (start, stop, step).'
+        return s.indices(self._len)
+
+    def _iter_range(self, start, stop):
+        'Iterate positions start..stop-1 without copying.'
+        if start >= stop:
+            return
+        k, j = self._locate(start)
+        remaining = stop - start
+        for block in itertools.islice(self._blocks, k, None):
+            chunk = itertools.islice(block, j, j + remaining)
+            for x in chunk:
+                yield x
+            remaining -= len(block) - j
+            if remaining <= 0:
+                return
+            j = 0
+
+    def _splice(self, start, stop, values):
+        'Replace positions start..stop-1 with the list values.'
+        blocks = self._blocks
+        if start < self._len:
+            k1, j1 = self._locate(start)
+        else:
+            k1, j1 = len(blocks) - 1, len(blocks[-1])
+        if stop < self._len:
+            k2, j2 = self._locate(stop)
+        else:
+            k2, j2 = len(blocks) - 1, len(blocks[-1])
+        items = list(itertools.islice(blocks[k1], j1))
+        items += values
+        items += itertools.islice(blocks[k2], j2, None)
+        blocks[k1:k2 + 1] = [collections.deque(items[p:p + _BLOCKLEN])
+                             for p in range(0, len(items), _BLOCKLEN)]
+        if not blocks:
+            blocks.append(collections.deque())
+        self._len += len(values) - (stop - start)
+        self._index = None
+
+    def _position(self, i):
+        i = operator.index(i)
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError('deque index out of range')
+        return i
+
+    # -- structural changes -------------------------------------------------
+
+    def _split(self, k):
+        block = self._blocks[k]
+        half = len(block) // 2
+        right = collections.deque(itertools.islice(block, half, None))
+        for _ in range(len(block) - half):
+            block.pop()
+        self._blocks.insert(k + 1, right)
+        self._index = None
+
+    def _shrunk(self, k):
+        'Drop block k if it became empty, or merge it into a neighbour if small.'
+        blocks = self._blocks
+        block = blocks[k]
+        if not block:
+            if len(blocks) > 1:
+                del blocks[k]
+                self._index = None
+        elif len(block) < _BLOCKLEN // 4 and 0 < k < len(blocks) - 1:
+            left = blocks[k - 1]
+            if len(left) + len(block) <= _BLOCKLEN:
+                left.extend(block)
+                del blocks[k]
+                self._index = None
+
+    # -- end operations ------------------------------------------------------
+
+    def append(self, x):
+        if self._maxlen == 0:
+            return
+        blocks = self._blocks
+        if len(blocks[-1]) >= _BLOCKLEN:
+            blocks.append(collections.deque())
+            self._index = None
+        blocks[-1].append(x)
+        self._bump(len(blocks) - 1, 1)
+        self._len += 1
+        if self._maxlen is not None and self._len > self._maxlen:
+            self.popleft()
+
+    def appendleft(self, x):
+        if self._maxlen == 0:
+            return
+        blocks = self._blocks
+        if len(blocks[0]) >= _BLOCKLEN:
+            blocks.insert(0, collections.deque())
+            self._index = None
+        blocks[0].appendleft(x)
+        self._bump(0, 1)
+        self._len += 1
+        if self._maxlen is not None and self._len > self._maxlen:
+            self.pop()
+
+    def pop(self):
+        if not self._len:
+            raise IndexError('pop from an empty deque')
+        blocks = self._blocks
+        x = blocks[-1].pop()
+        self._bump(len(blocks) - 1, -1)
+        self._len -= 1
+        if not blocks[-1] and len(blocks) > 1:
+            blocks.pop()
+            self._index = None
+        return x
+
+    def popleft(self):
+        if not self._len:
+            raise IndexError('pop from an empty deque')
+        blocks = self._blocks
+        x = blocks[0].popleft()
+        self._bump(0, -1)
+        self._len -= 1
+        if not blocks[0] and len(blocks) > 1:
+            del blocks[0]
+            self._index = None
+        return x
+
+    def extend(self, iterable):
+        if iterable is self:
+            iterable = list(iterable)
+        for x in iterable:
+            self.append(x)
+
+    def extendleft(self, iterable):
+        if iterable is self:
+            iterable = list(iterable)
+        for x in iterable:
+            self.appendleft(x)
+
+    def clear(self):
+        self._blocks = [collections.deque()]
+        self._len = 0
+        self._index = None
+
+    # -- positional operations ----------------------------------------------
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = self._slice(i)
+            if step == 1:
+                return type(self)(self._iter_range(start, stop), self._maxlen)
+            return type(self)(map(self.__getitem__, range(start, stop, step)),
+                              self._maxlen)
+        k, j = self._locate(self._position(i))
+        return self._blocks[k][j]
+
+    def __setitem__(self, i, x):
+        if isinstance(i, slice):
+            start, stop, step = self._slice(i)
+            values = list(x)
+            if step == 1:
+                stop = max(stop, start)
+                size = self._len + len(values) - (stop - start)
+                if self._maxlen is not None and size > self._maxlen:
+                    raise IndexError('deque already at its maximum size')
+                self._splice(start, stop, values)
+                return
+            positions = range(start, stop, step)
+            if len(values) != len(positions):
+                raise ValueError(f'attempt to assign sequence of size {len(values)} '
+                                 f'to extended slice of size {len(positions)}')
+            for p, v in zip(positions, values):
+                self[p] = v
+            return
+        k, j = self._locate(self._position(i))
+        self._blocks[k][j] = x
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = self._slice(i)
+            if step == 1:
+                if start < stop:
+                    self._splice(start, stop, [])
+                return
+            positions = range(start, stop, step)
+            if step > 0:
+                positions = reversed(positions)
+            for p in positions:
+                del self[p]
+            return
+        k, j = self._locate(self._position(i))
+        del self._blocks[k][j]
+        self._bump(k, -1)
+        self._len -= 1
+        self._shrunk(k)
+
+    def insert(self, i, x):
+        if self._maxlen is not None and self._len >= self._maxlen:
+            raise IndexError('deque already at its maximum size')
+        i = operator.index(i)
+        if i < 0:
+            i = max(i + self._len, 0)
+        if i >= self._len:
+            self.append(x)
+            return
+        if i == 0:
+            self.appendleft(x)
+            return
+        k, j = self._locate(i)
+        block = self._blocks[k]
+        block.insert(j, x)
+        self._bump(k, 1)
+        self._len += 1
+        if len(block) > 2 * _BLOCKLEN:
+            self._split(k)
+
+    # -- whole-sequence operations ------------------------------------------
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._blocks)
+
+    def __reversed__(self):
+        return itertools.chain.from_iterable(map(reversed, reversed(self._blocks)))
+
+    def __contains__(self, x):
+        return any(x in block for block in self._blocks)
+
+    def __eq__(self, other):
+        if not isinstance(other, BlockDeque):
+            return NotImplemented
+        return self._len == other._len and all(map(operator.eq, self, other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        if self._maxlen is None:
+            return f'{type(self).__name__}({list(self)!r})'
+        return f'{type(self).__name__}({list(self)!r}, maxlen={self._maxlen})'
+
+    def __copy__(self):
+        return type(self)(self, self._maxlen)
+
+    copy = __copy__
+
+    def __reduce__(self):
+        return type(self), (list(self), self._maxlen)
+
+    def view(self, start=None, stop=None):
+        'Return a read-only window over positions start..stop-1 without copying.'
+        start, stop, _ = slice(start, stop).indices(self._len)
+        return BlockDequeView(self, start, max(start, stop))
+
+    def count(self, x):
+        return sum(block.count(x) for block in self._blocks)
+
+    def index(self, x, start=0, stop=None):
+        n = self._len
+        start = max(start + n, 0) if start < 0 else min(start, n)
+        stop = n if stop is None else stop
+        stop = max(stop + n, 0) if stop < 0 else min(stop, n)
+        for i, value in enumerate(self._iter_range(start, stop), start):
+            if value == x:
+                return i
+        raise ValueError(f'{x!r} is not in deque')
+
+    def remove(self, value):
+        for k, block in enumerate(self._blocks):
+            try:
+                block.remove(value)
+            except ValueError:
+                continue
+            self._bump(k, -1)
+            self._len -= 1
+            self._shrunk(k)
+            return
+        raise ValueError(f'{value!r} is not in deque')
+
+    def reverse(self):
+        self._blocks.reverse()
+        for block in self._blocks:
+            block.reverse()
+        self._index = None
+
+    def rotate(self, n=1):
+        if self._len <= 1:
+            return
+        n %= self._len
+        if n > self._len // 2:
+            for _ in range(self._len - n):
+                self.append(self.popleft())
+        else:
+            for _ in range(n):
+                self.appendleft(self.pop())
+
+
+class BlockDequeView(collections.abc.Sequence):
+    '''Read-only window over a range of positions in a BlockDeque.
+
+    The view holds no copy of the items; it reads through to the deque, so
+    later changes to the deque are visible. Positions are fixed when the view
+    is created and are clipped to the current length of the deque.
+    '''
+
+    __slots__ = ('_deque', '_start', '_stop')
+
+    def __init__(self, deque, start, stop):
+        self._deque = deque
+        self._start = start
+        self._stop = stop
+
+    def __len__(self):
+        return max(0, min(self._stop, len(self._deque)) - self._start)
+
+    def __getitem__(self, i):
+        n = len(self)
+        if isinstance(i, slice):
+            start, stop, step = i.indices(n)
+            if step == 1:
+                return BlockDequeView(self._deque, self._start + start,
+                                      self._start + max(start, stop))
+            return [self[p] for p in range(start, stop, step)]
+        i = operator.index(i)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('view index out of range')
+        return self._deque[self._start + i]
+
+    def __iter__(self):
+        return self._deque._iter_range(self._start, self._start + len(self))
+
+    def __reversed__(self):
+        for i in range(len(self) - 1, -1, -1):
+            yield self[i]
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self)!r})'
+
+
+'''
+NumericDeque
+A bounded sliding window of numbers, stored in a contiguous typed buffer
+instead of a deque of boxed Python objects. It replaces the moving_average
+recipe above when the window is large or samples arrive in batches.
+
+NumericDeque(typecode, maxlen) takes any array module typecode ('d', 'f', 'i',
+'q', ...) and a required maxlen. The buffer holds each sample twice, at p and at
+p + maxlen, so the current window is always one contiguous slice. That costs
+twice the window's raw size and makes memoryview() zero-copy.
+
+append(x) updates the window statistics in O(1) (amortized, for min and max).
+extend(data) accepts an array, a memoryview, a NumPy array or any iterable, and
+copies it into the buffer with slice assignment. Its statistics are updated once
+per batch rather than once per sample. rolling(data, stat) pushes a batch and
+returns the chosen statistic after each sample. It is vectorized when NumPy is
+installed: sums and variances come from prefix sums taken per block of maxlen
+samples, each around its own block mean, and min and max from running extrema
+within each block, so the cost is linear in the batch.
+extend() drops the min and max queues; the first min() or max() afterwards
+rebuilds them from the window, and append() keeps them from then on.
+
+sum() and mean() come from running sums, and var() from running sums of squares.
+For float typecodes, those sums are taken around a shift near the window mean.
+They are recomputed exactly with math.fsum once every maxlen samples, and
+whenever var() finds the window has drifted far from the shift or has shed
+values much larger than the ones it holds, so rounding
+error does not accumulate. For integer typecodes, the sums are exact.
+
+>>> w = NumericDeque('d', maxlen=3)
+>>> w.extend([40, 30, 50, 46, 39, 44])
+>>> w.mean(), w.min(), w.max()
+(43.0, 39.0, 46.0)
+>>> list(w.rolling([50, 50], 'mean'))
+[44.333333333333336, 48.0]
+'''
+
+
+class NumericDeque:
+    'Fixed-size numeric sliding window backed by a contiguous typed buffer.'
+
+    def __init__(self, typecode='d', maxlen=None, iterable=()):
+        if maxlen is None:
+            raise TypeError('NumericDeque requires a maxlen')
+        maxlen = operator.index(maxlen)
+        if maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        self._maxlen = maxlen
+        self._typecode = typecode
+        self._exact = typecode not in 'fd'
+        self._buf = array.array(typecode, bytes(2 * maxlen * array.array(typecode).itemsize))
+        self._view = memoryview(self._buf)
+        self.clear()
+        self.extend(iterable)
+
+    @property
+    def maxlen(self):
+        return self._maxlen
+
+    @property
+    def typecode(self):
+        return self._typecode
+
+    def clear(self):
+        self._start = 0
+        self._len = 0
+        self._seen = 0
+        self._shift = 0
+        self._sum = 0
+        self._sumsq = 0
+        self._peak = 0
+        self._since_sync = 0
+        self._minq = collections.deque()
+        self._maxq = collections.deque()
+        self._monotonic = True
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return iter(self.memoryview())
+
+    def __getitem__(self, i):
+        return self.memoryview()[i]
+
+    def __repr__(self):
+        return (f'{type(self).__name__}({self._typecode!r}, maxlen={self._maxlen}, '
+                f'iterable={self.memoryview().tolist()!r})')
+
+    def memoryview(self):
+        'Return the current window, oldest first, as a zero-copy memoryview.'
+        return self._view[self._start:self._start + self._len]
+
+    # -- updates ------------------------------------------------------------
+
+    def append(self, x):
+        maxlen = self._maxlen
+        buf = self._buf
+        if self._len == maxlen:
+            old = buf[self._start]
+            pos = self._start
+            self._start = (pos + 1) % maxlen
+            self._sum -= old - self._shift
+            self._sumsq -= (old - self._shift) ** 2
+        else:
+            pos = (self._start + self._len) % maxlen
+            self._len += 1
+        buf[pos] = buf[pos + maxlen] = x
+        x = buf[pos]
+        if self._len == 1 and not self._exact:
+            self._shift, self._sum, self._sumsq, self._peak = x, 0.0, 0.0, 0.0
+        self._sum += x - self._shift
+        self._sumsq += (x - self._shift) ** 2
+        if self._sumsq > self._peak:
+            self._peak = self._sumsq
+        seq = self._seen
+        self._seen += 1
+        if self._monotonic:
+            self._push_extrema(seq, x)
+        self._since_sync += 1
+        if self._since_sync >= maxlen and not self._exact:
+            self._resync()
+
+    def popleft(self):
+        if not self._len:
+            raise IndexError('pop from an empty deque')
+        x = self._buf[self._start]
+        self._start = (self._start + 1) % self._maxlen
+        self._len -= 1
+        self._sum -= x - self._shift
+        self._sumsq -= (x - self._shift) ** 2
+        if not self._len:
+            self._sum = self._sumsq = 0
+        if self._monotonic:
+            self._expire_extrema()
+        return x
+
+    def extend(self, data):
+        src = self._as_buffer(data)
+        maxlen = self._maxlen
+        n = len(src)
+        if not n:
+            return
+        if n >= maxlen:
+            self._start = 0
+            self._len = 0
+            self._write(0, src[n - maxlen:])
+            self._len = maxlen
+            self._seen += n
+            self._resync()
+        else:
+            evicted = max(0, self._len + n - maxlen)
+            if evicted:
+                s, q = self._moments(self.memoryview()[:evicted])
+                self._sum -= s
+                self._sumsq -= q
+                self._start = (self._start + evicted) % maxlen
+                self._len -= evicted
+            self._write((self._start + self._len) % maxlen, src)
+            self._len += n
+            self._seen += n
+            s, q = self._moments(src)
+            self._sum += s
+            self._sumsq += q
+            self._peak = max(self._peak, self._sumsq)
+            self._since_sync += n
+            if self._since_sync >= maxlen and not self._exact:
+                self._resync()
+        self._monotonic = False
+
+    def _as_buffer(self, data):
+        'Return data as a memoryview in this deque\'s item format.'
+        if np is not None and isinstance(data, np.ndarray):
+            data = np.ascontiguousarray(data, dtype=self._buf.typecode)
+        try:
+            view = memoryview(data)
+        except TypeError:
+            return memoryview(array.array(self._typecode, data))
+        if view.ndim == 1 and view.format.lstrip('@=<') == self._typecode:
+            return view
+        return memoryview(array.array(self._typecode, view.tolist()))
+
+    def _write(self, pos, src):
+        'Copy src (at most maxlen items) into the ring and its mirror at pos.'
+        view = self._view
+        maxlen = self._maxlen
+        first = min(len(src), maxlen - pos)
+        view[pos:pos + first] = src[:first]
+        view[pos + maxlen:pos + maxlen + first] = src[:first]
+        rest = len(src) - first
+        if rest:
+            view[:rest] = src[first:]
+            view[maxlen:maxlen + rest] = src[first:]
+
+    def _moments(self, values):
+        'Return the sum and sum of squares of values, around the current shift.'
+        shift = self._shift
+        if np is not None and len(values) > 64:
+            a = np.frombuffer(values, dtype=self._typecode)
+            if self._exact:
+                return int(a.sum(dtype=object)), int(np.square(a, dtype=object).sum())
+            a = a - shift
+            return float(a.sum()), float(np.dot(a, a))
+        if self._exact:
+            return sum(values), sum(map(operator.mul, values, values))
+        centred = [x - shift for x in values]
+        return math.fsum(centred), math.fsum(map(operator.mul, centred, centred))
+
+    def _resync(self):
+        'Recompute the running sums exactly, re-centring floats on the mean.'
+        window = self.memoryview()
+        if not self._exact:
+            self._shift = math.fsum(window) / self._len if self._len else 0.0
+        self._sum, self._sumsq = self._moments(window)
+        self._peak = self._sumsq
+        self._since_sync = 0
+
+    def _push_extrema(self, seq, x):
+        minq, maxq = self._minq, self._maxq
+        while minq and minq[-1][1] >= x:
+            minq.pop()
+        minq.append((seq, x))
+        while maxq and maxq[-1][1] <= x:
+            maxq.pop()
+        maxq.append((seq, x))
+        self._expire_extrema()
+
+    def _expire_extrema(self):
+        oldest = self._seen - self._len
+        minq, maxq = self._minq, self._maxq
+        while minq and minq[0][0] < oldest:
+            minq.popleft()
+        while maxq and maxq[0][0] < oldest:
+            maxq.popleft()
+
+    def _rebuild_extrema(self):
+        self._minq.clear()
+        self._maxq.clear()
+        seq = self._seen - self._len
+        self._monotonic = True
+        for x in self.memoryview():
+            self._push_extrema(seq, x)
+            seq += 1
+
+    # -- statistics ---------------------------------------------------------
+
+    def sum(self):
+        return self._sum + self._len * self._shift
+
+    def mean(self):
+        if not self._len:
+            raise ValueError('mean of an empty window')
+        return self._sum / self._len + self._shift
+
+    def var(self, ddof=0):
+        n = self._len
+        if n - ddof <= 0:
+            raise ValueError('not enough samples for variance')
+        spread = self._sumsq - self._sum * self._sum / n
+        spread = max(spread, 0.0)
+        if not self._exact and (self._sum * self._sum > 1e4 * n * spread
+                                or self._peak > 1e8 * spread):
+            # The window has drifted far from the shift, or has shed much
+            # larger values; recompute before cancellation eats the result.
+            self._resync()
+            spread = self._sumsq - self._sum * self._sum / n
+        return max(spread / (n - ddof), 0.0)
+
+    def min(self):
+        if not self._len:
+            raise ValueError('min of an empty window')
+        if not self._monotonic:
+            self._rebuild_extrema()
+        return self._minq[0][1]
+
+    def max(self):
+        if not self._len:
+            raise ValueError('max of an empty window')
+        if not self._monotonic:
+            self._rebuild_extrema()
+        return self._maxq[0][1]
+
+    def rolling(self, data, stat='mean'):
+        'Push data and return an array of stat computed after each sample.'
+        if stat not in ('sum', 'mean', 'var', 'min', 'max'):
+            raise ValueError(f'unknown statistic {stat!r}')
+        src = self._as_buffer(data)
+        if np is None or not len(src):
+            method = getattr(self, stat)
+            out = array.array('d')
+            for x in src:
+                self.append(x)
+                out.append(method())
+            return out
+        maxlen = self._maxlen
+        prior = np.frombuffer(self.memoryview(), dtype=self._typecode)
+        new = np.frombuffer(src, dtype=self._typecode)
+        series = np.concatenate([prior, new]).astype('f8')
+        ends = np.arange(len(prior) + 1, len(series) + 1)
+        if stat in ('min', 'max'):
+            out = _rolling_extrema(series, ends, maxlen, np.minimum if stat == 'min' else np.maximum)
+        else:
+            counts, means, spreads = _rolling_moments(series, ends, maxlen)
+            if stat == 'sum':
+                out = means * counts
+            elif stat == 'mean':
+                out = means
+            else:
+                out = np.maximum(spreads / counts, 0.0)
+        self.extend(src)
+        return array.array('d', out.tobytes())
+
+
+def _blocks(series, width, fill):
+    'Reshape series into rows of width, padding the last row with fill.'
+    pad = -len(series) % width
+    if pad:
+        series = np.concatenate([series, np.full(pad, fill)])
+    return series.reshape(-1, width)
+
+
+def _rolling_extrema(series, ends, width, ufunc):
+    'Return ufunc over series[max(e - width, 0):e] for each e in ends, in O(n).'
+    # Van Herk / Gil-Werman: cut the series into blocks of width samples. A
+    # window spans the tail of one block and the head of the next, so its
+    # extreme is that of a block suffix and a block prefix, and both come
+    # from one accumulate per block.
+    identity = np.inf if ufunc is np.minimum else -np.inf
+    padded = np.concatenate([np.full(width - 1, identity), series])
+    blocks = _blocks(padded, width, identity)
+    prefix = ufunc.accumulate(blocks, axis=1).ravel()
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(suffix[ends - 1], prefix[ends + width - 2])
+
+
+def _rolling_moments(series, ends, width):
+    'Return the count, mean and sum of squared deviations of each window.'
+    # Prefix sums are taken within each block of width samples, around that
+    # block's mean, so rounding error follows the spread of at most two
+    # windows. A window covers part a (the tail of one block) and part b (the
+    # head of the next, possibly empty); the two are combined with Chan's
+    # pairwise update.
+    n = len(series)
+    blocks = _blocks(series, width, 0.0)
+    sizes = np.minimum(width, n - np.arange(len(blocks)) * width)
+    centres = blocks.sum(axis=1) / sizes
+    dev = blocks - centres[:, None]
+    if n % width:
+        dev[-1, n % width:] = 0.0
+    zero = np.zeros((len(blocks), 1))
+    p1 = np.hstack([zero, np.cumsum(dev, axis=1)])
+    p2 = np.hstack([zero, np.cumsum(dev * dev, axis=1)])
+    starts = np.maximum(ends - width, 0)
+    ka, ja = np.divmod(starts, width)
+    kb, jb = np.divmod(ends - 1, width)
+    jb += 1
+    same = ka == kb
+    stop_a = np.where(same, jb, width)
+    n_a = stop_a - ja
+    n_b = np.where(same, 0, jb)
+    kb = np.where(same, ka, kb)
+    s_a = p1[ka, stop_a] - p1[ka, ja]
+    q_a = p2[ka, stop_a] - p2[ka, ja]
+    s_b = p1[kb, n_b]
+    q_b = p2[kb, n_b]
+    safe_b = np.maximum(n_b, 1)
+    m2 = (q_a - s_a * s_a / n_a) + (q_b - s_b * s_b / safe_b)
+    delta = (centres[kb] - centres[ka]) + (s_b / safe_b - s_a / n_a)
+    counts = n_a + n_b
+    m2 += delta * delta * n_a * n_b / counts
+    means = centres[ka] + s_a / n_a + delta * n_b / counts
+    # Centring on the block mean still cancels catastrophically for a window of
+    # small values in a block that also holds huge ones. Windows whose rounding
+    # bound is not far below their spread are recomputed in two passes.
+    bound = np.finfo(float).eps * width * (p2[ka, stop_a] + p2[kb, n_b])
+    for i in np.flatnonzero(bound > 1e-9 * m2):
+        window = series[starts[i]:ends[i]]
+        means[i] = window.mean()
+        m2[i] = np.square(window - means[i]).sum()
+    return counts, means, m2
+
+
+'''
+tail, follow and tail_many
+The tail recipe above reads and decodes every line of the file to keep the
+last n. tail() maps the file into memory instead and searches backward from
+the end for newlines, so the work depends on n and the length of those lines,
+not on the size of the file.
+
+Lines are split on b'\n' and keep their line ending, like iterating over a file
+in binary mode; they are decoded afterwards with encoding (pass encoding=None
+to get bytes). A final line without a newline counts as a line for tail();
+follow() holds it back until its newline arrives.
+
+follow() yields the last n lines and then keeps yielding lines as they are
+appended, reading only the new bytes on each poll. It starts over if the file
+is truncated or replaced (for example by log rotation). tail_many() runs tail()
+over many files in a thread pool. The threads overlap opening and mapping the
+files, but mmap.rfind holds the GIL, so the searches themselves take turns.
+
+>>> tail('/var/log/syslog', 3)                              # doctest: +SKIP
+deque(['...', '...', '...'], maxlen=3)
+'''
+
+
+def tail(filename, n=10, encoding='utf-8', errors='strict'):
+    'Return the last n lines of a file, scanning backward from the end.'
+    with open(filename, 'rb') as f:
+        return _tail(f, n, encoding, errors)[0]
+
+
+def _tail(f, n, encoding, errors, complete=False):
+    '''Return (deque of the last n lines, offset read up to) for a binary file.
+
+    With complete=True an unterminated last line is left out, and the offset
+    returned is where it starts rather than the file size.
+    '''
+    lines = collections.deque(maxlen=n)
+    size = os.fstat(f.fileno()).st_size
+    if not size:
+        return lines, size
+    with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+        if complete and mm[size - 1:size] != b'\n':
+            size = mm.rfind(b'\n') + 1
+        end = size
+        if mm[end - 1:end] == b'\n':
+            end -= 1
+        start = end
+        for _ in range(n):
+            start = mm.rfind(b'\n', 0, end)
+            if start < 0:
+                break
+            end = start
+        start = start + 1 if start >= 0 else 0
+        data = mm[start:size]
+    *found, last = data.split(b'\n')
+    found = [line + b'\n' for line in found]
+    if last:
+        found.append(last)
+    for line in found:
+        lines.append(line if encoding is None else line.decode(encoding, errors))
+    return lines, size
+
+
+def follow(filename, n=10, interval=0.5, encoding='utf-8', errors='strict'):
+    'Yield the last n lines of a file, then each line appended to it.'
+    with open(filename, 'rb') as f:
+        lines, offset = _tail(f, n, encoding, errors, complete=True)
+        identity = os.fstat(f.fileno()).st_ino
+    yield from lines
+    pending = b''
+    while True:
+        try:
+            st = os.stat(filename)
+        except FileNotFoundError:
+            time.sleep(interval)
+            continue
+        if st.st_ino != identity or st.st_size < offset:
+            identity, offset, pending = st.st_ino, 0, b''
+        if st.st_size == offset:
+            time.sleep(interval)
+            continue
+        with open(filename, 'rb') as f:
+            f.seek(offset)
+            chunk = f.read(st.st_size - offset)
+        offset += len(chunk)
+        *complete, pending = (pending + chunk).split(b'\n')
+        for line in complete:
+            line += b'\n'
+            yield line if encoding is None else line.decode(encoding, errors)
+
+
+def tail_many(filenames, n=10, workers=None, encoding='utf-8', errors='strict'):
+    'Return a dict mapping each filename to the last n lines of that file.'
+    filenames = list(filenames)
+    with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+        results = pool.map(lambda name: tail(name, n, encoding, errors), filenames)
+        return dict(zip(filenames, results))
+
+
+'''
+AsyncDeque and async_roundrobin
+A deque for coroutines. append(), appendleft(), pop(), popleft() and extend()
+are awaitable: the pops wait while the deque is empty, and when maxlen is set
+the appends wait while it is full. A bounded AsyncDeque applies backpressure to
+producers instead of discarding items from the opposite end. Each awaitable
+method has a *_nowait twin that raises IndexError instead of waiting. The
+remaining deque operations (rotate, remove, indexing, iteration, ...) are
+synchronous and work on the items directly. Waiters are woken in FIFO order.
+Like asyncio.Queue, an AsyncDeque is not thread-safe and belongs to one event
+loop.
+
+async_roundrobin() is the roundrobin recipe for async iterators. Each source is
+read by its own task into a small bounded AsyncDeque, so a slow source never
+stalls the others. The consumer takes up to weights[i] items from source i on
+each turn, skipping sources that have nothing ready.
+
+>>> async def main():                                      # doctest: +SKIP
+...     d = AsyncDeque(maxlen=2)
+...     await d.append('a')
+...     await d.append('b')
+...     consumer = asyncio.ensure_future(d.popleft())
+...     await d.append('c')                # waits until the consumer runs
+...     return await consumer, list(d)
+>>> asyncio.run(main())                                    # doctest: +SKIP
+('a', ['b', 'c'])
+'''
+
+
+class AsyncDeque:
+    'Deque with awaitable appends and pops and a backpressuring maxlen.'
+
+    def __init__(self, iterable=(), maxlen=None):
+        self._items = collections.deque(iterable)
+        if maxlen is not None and len(self._items) > maxlen:
+            raise ValueError('initial items exceed maxlen')
+        self._maxlen = maxlen
+        self._getters = collections.deque()
+        self._putters = collections.deque()
+
+    @property
+    def maxlen(self):
+        return self._maxlen
+
+    def full(self):
+        return self._maxlen is not None and len(self._items) >= self._maxlen
+
+    def empty(self):
+        return not self._items
+
+    # -- waiting ------------------------------------------------------------
+
+    @staticmethod
+    def _wakeup(waiters):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    async def _wait(self, waiters, blocked):
+        while blocked():
+            waiter = asyncio.get_running_loop().create_future()
+            waiters.append(waiter)
+            try:
+                await waiter
+            except BaseException:
+                waiter.cancel()
+                try:
+                    waiters.remove(waiter)
+                except ValueError:
+                    pass
+                if not blocked() and not waiter.cancelled():
+                    # We were woken but will not act on it; pass the turn on.
+                    self._wakeup(waiters)
+                raise
+
+    async def _room(self):
+        await self._wait(self._putters, self.full)
+
+    async def _item(self):
+        await self._wait(self._getters, self.empty)
+
+    # -- non-blocking operations --------------------------------------------
+
+    def append_nowait(self, x):
+        if self.full():
+            raise IndexError('deque already at its maximum size')
+        self._items.append(x)
+        self._wakeup(self._getters)
+
+    def appendleft_nowait(self, x):
+        if self.full():
+            raise IndexError('deque already at its maximum size')
+        self._items.appendleft(x)
+        self._wakeup(self._getters)
+
+    def pop_nowait(self):
+        x = self._items.pop()
+        self._wakeup(self._putters)
+        return x
+
+    def popleft_nowait(self):
+        x = self._items.popleft()
+        self._wakeup(self._putters)
+        return x
+
+    # -- awaitable operations -----------------------------------------------
+
+    async def append(self, x):
+        await self._room()
+        self.append_nowait(x)
+
+    async def appendleft(self, x):
+        await self._room()
+        self.appendleft_nowait(x)
+
+    async def pop(self):
+        await self._item()
+        return self.pop_nowait()
+
+    async def popleft(self):
+        await self._item()
+        return self.popleft_nowait()
+
+    async def extend(self, iterable):
+        for x in iterable:
+            await self.append(x)
+
+    # -- synchronous deque operations ---------------------------------------
+
+    def clear(self):
+        self._items.clear()
+        for _ in range(len(self._putters)):
+            self._wakeup(self._putters)
+
+    def remove(self, value):
+        self._items.remove(value)
+        self._wakeup(self._putters)
+
+    def rotate(self, n=1):
+        self._items.rotate(n)
+
+    def count(self, x):
+        return self._items.count(x)
+
+    def index(self, x, *args):
+        return self._items.index(x, *args)
+
+    def __getitem__(self, i):
+        return self._items[i]
+
+    def __setitem__(self, i, x):
+        self._items[i] = x
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __contains__(self, x):
+        return x in self._items
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self._items)!r}, maxlen={self._maxlen})'
+
+
+_DONE = object()
+
+
+async def async_roundrobin(*iterables, weights=None):
+    "Interleave async iterators, taking up to weights[i] ready items from each."
+    if weights is None:
+        weights = [1] * len(iterables)
+    if len(weights) != len(iterables):
+        raise ValueError('need one weight per iterable')
+    if any(w < 1 for w in weights):
+        raise ValueError('weights must be positive')
+    ready = asyncio.Event()
+
+    async def pump(iterable, buffer):
+        try:
+            async for x in iterable:
+                await buffer.append(x)
+                ready.set()
+        except Exception as exc:
+            x = _SourceError(exc)
+        else:
+            x = _DONE
+        await buffer.append(x)
+        ready.set()
+
+    sources = collections.deque()
+    tasks = []
+    for iterable, weight in zip(iterables, weights):
+        buffer = AsyncDeque(maxlen=weight + 1)
+        sources.append((buffer, weight))
+        tasks.append(asyncio.ensure_future(pump(iterable, buffer)))
+    try:
+        while sources:
+            ready.clear()
+            progressed = False
+            for _ in range(len(sources)):
+                buffer, weight = sources[0]
+                done = False
+                for _ in range(min(weight, len(buffer))):
+                    x = buffer.popleft_nowait()
+                    progressed = True
+                    if x is _DONE:
+                        done = True
+                        break
+                    if isinstance(x, _SourceError):
+                        raise x.exc
+                    yield x
+                if done:
+                    sources.popleft()
+                else:
+                    sources.rotate(-1)
+            if not progressed:
+                await ready.wait()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class _SourceError:
+    'Carries an exception from a source iterator to the consumer.'
+
+    __slots__ = ('exc',)
+
+    def __init__(self, exc):
+        self.exc = exc
+
+
+def bench_block_deque(sizes=(10**3, 10**4, 10**5, 10**6, 10**7), ops=1000):
+    'Time middle and end operations on BlockDeque against collections.deque.'
+    for n in sizes:
+        for cls in (collections.deque, BlockDeque):
+            d = cls(range(n))
+            mid = n // 2
+            t0 = time.perf_counter()
+            for _ in range(ops):
+                d[mid]
+            t1 = time.perf_counter()
+            for _ in range(ops):
+                del d[mid]
+                d.insert(mid, 0)
+            t2 = time.perf_counter()
+            for _ in range(ops):
+                d.append(d.popleft())
+            t3 = time.perf_counter()
+            print(f'{cls.__name__:>10} n={n:<9} '
+                  f'get-mid {(t1 - t0) / ops * 1e6:8.2f} us  '
+                  f'del+insert-mid {(t2 - t1) / ops * 1e6:8.2f} us  '
+                  f'popleft+append {(t3 - t2) / ops * 1e6:8.2f} us')
+
+
+def bench_numeric_deque(samples=10**6, maxlen=1000, batch=10**4):
+    'Compare the moving_average recipe with NumericDeque per-sample and batched.'
+    import random
+    data = array.array('d', (random.random() for _ in range(samples)))
+
+    def moving_average(iterable, n=3):
+        it = iter(iterable)
+        d = collections.deque(itertools.islice(it, n - 1))
+        d.appendleft(0)
+        s = sum(d)
+        for elem in it:
+            s += elem - d.popleft()
+            d.append(elem)
+            yield s / n
+
+    t0 = time.perf_counter()
+    for _ in moving_average(data, maxlen):
+        pass
+    t1 = time.perf_counter()
+    w = NumericDeque('d', maxlen)
+    for x in data:
+        w.append(x)
+        w.mean()
+    t2 = time.perf_counter()
+    w = NumericDeque('d', maxlen)
+    view = memoryview(data)
+    for p in range(0, samples, batch):
+        w.rolling(view[p:p + batch], 'mean')
+    t3 = time.perf_counter()
+    w = NumericDeque('d', maxlen)
+    for p in range(0, samples, batch):
+        w.extend(view[p:p + batch])
+        w.mean(), w.var(), w.min(), w.max()
+    t4 = time.perf_counter()
+    print(f'recipe moving_average     {samples / (t1 - t0) / 1e6:8.2f} M samples/s')
+    print(f'NumericDeque.append       {samples / (t2 - t1) / 1e6:8.2f} M samples/s')
+    print(f'NumericDeque.rolling      {samples / (t3 - t2) / 1e6:8.2f} M samples/s')
+    print(f'NumericDeque.extend+stats {samples / (t4 - t3) / 1e6:8.2f} M samples/s')
+
+
+def bench_tail(sizes=(10**6, 10**7, 10**8), n=10):
+    'Compare the deque(f, n) recipe with tail() on files of increasing size.'
+    import tempfile
+    line = b'x' * 79 + b'\n'
+    for size in sizes:
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(line * (size // len(line)))
+        try:
+            t0 = time.perf_counter()
+            with open(f.name) as g:
+                collections.deque(g, n)
+            t1 = time.perf_counter()
+            tail(f.name, n)
+            t2 = time.perf_counter()
+        finally:
+            os.unlink(f.name)
+        print(f'{size:>11} bytes  recipe {(t1 - t0) * 1e3:9.2f} ms  '
+              f'tail {(t2 - t1) * 1e3:7.3f} ms')
+
+
+if __name__ == '__main__':
+    bench_block_deque()
+    bench_numeric_deque()
+    bench_tail()
@@ -136,4 +136,1212 @@ class list(object)
  |
  |  __hash__ = None
 
- '''
\ No newline at end of file
+ '''
+'''
+SortedList
+A sequence that keeps its items in sorted order as they are added and removed.
+It replaces the append-then-sort() and bisect.insort(lst, x) patterns, which
+cost O(n) per update on a plain list.
+
+Items are kept in a list of sorted sublists of bounded length, with the largest
+item of each sublist in a separate list and a lazily built tree of sublist
+lengths. add(x) and remove(x) bisect the maxima to find the sublist and then
+bisect within it, so they move at most a few thousand references. Positional
+access (sl[i], del sl[i], pop(i)) walks the length tree, and index(), count()
+and bisect_left()/bisect_right() turn a sublist position back into a position
+in the whole list the same way. All of these are O(log n).
+
+The read interface matches list: len(), iteration, reversed(), x in sl,
+sl[i], sl[i:j] (which returns a list), index(value, start, stop) and
+count(value). Items must be mutually comparable. There is no append, insert
+or sort, since the list decides where each item goes; use add() and update().
+
+irange(minimum, maximum, inclusive=(True, True), reverse=False) iterates the
+items between two values, and islice(start, stop, reverse=False) the items
+between two positions, without copying.
+
+>>> sl = SortedList([5, 1, 4])
+>>> sl.add(3)
+>>> sl
+SortedList([1, 3, 4, 5])
+>>> sl[1], sl.index(4), 2 in sl
+(3, 2, False)
+>>> list(sl.irange(2, 4))
+[3, 4]
+>>> sl.remove(4)
+>>> sl.pop()
+5
+'''
+
+import array
+import bisect
+import collections.abc
+import concurrent.futures
+import contextlib
+import datetime
+import heapq
+import itertools
+import operator
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+import types
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_LOAD = 1000
+
+
+class SortedList(collections.abc.Sequence):
+    'Sequence kept in sorted order, with O(log n) add, remove and positional access.'
+
+    def __init__(self, iterable=()):
+        self.clear()
+        self.update(iterable)
+
+    def clear(self):
+        self._lists = []
+        self._maxes = []
+        self._len = 0
+        self._index = None
+        self._size = 0
+
+    def _reset(self, values):
+        'Rebuild from an already sorted list of values.'
+        self._lists = [values[i:i + _LOAD] for i in range(0, len(values), _LOAD)]
+        self._maxes = [block[-1] for block in self._lists]
+        self._len = len(values)
+        self._index = None
+
+    # -- positional index over sublist lengths ------------------------------
+
+    def _build_index(self):
+        lists = self._lists
+        size = 1
+        while size < len(lists):
+            size *= 2
+        tree = [0] * size
+        tree.extend(len(b) for b in lists)
+        tree.extend([0] * (size - len(lists)))
+        for i in range(size - 1, 0, -1):
+            tree[i] = tree[2 * i] + tree[2 * i + 1]
+        self._index = tree
+        self._size = size
+
+    def _bump(self, k, delta):
+        'Adjust the recorded length of sublist k, if the index is live.'
+        tree = self._index
+        if tree is not None:
+            i = k + self._size
+            while i:
+                tree[i] += delta
+                i >>= 1
+
+    def _locate(self, i):
+        'Return (sublist number, offset in sublist) for a non-negative position.'
+        lists = self._lists
+        first = len(lists[0])
+        if i < first:
+            return 0, i
+        last = len(lists[-1])
+        if i >= self._len - last:
+            return len(lists) - 1, i - (self._len - last)
+        if self._index is None:
+            self._build_index()
+        tree = self._index
+        size = self._size
+        node = 1
+        while node < size:
+            node *= 2
+            if i >= tree[node]:
+                i -= tree[node]
+                node += 1
+        return node - size, i
+
+    def _position(self, k, j):
+        'Return the position of offset j in sublist k.'
+        if k == 0:
+            return j
+        if k == len(self._lists) - 1:
+            return self._len - len(self._lists[k]) + j
+        if self._index is None:
+            self._build_index()
+        tree = self._index
+        i = k + self._size
+        while i > 1:
+            if i & 1:
+                j += tree[i - 1]
+            i >>= 1
+        return j
+
+    def _split(self, k):
+        block = self._lists[k]
+        half = block[_LOAD:]
+        del block[_LOAD:]
+        self._maxes[k] = block[-1]
+        self._lists.insert(k + 1, half)
+        self._maxes.insert(k + 1, half[-1])
+        self._index = None
+
+    def _delete(self, k, j):
+        'Remove the item at offset j of sublist k.'
+        lists = self._lists
+        maxes = self._maxes
+        block = lists[k]
+        del block[j]
+        self._len -= 1
+        if not block:
+            del lists[k], maxes[k]
+            self._index = None
+            return
+        maxes[k] = block[-1]
+        if len(block) < _LOAD // 2 and k + 1 < len(lists):
+            block.extend(lists[k + 1])
+            del lists[k + 1], maxes[k + 1]
+            maxes[k] = block[-1]
+            self._index = None
+            if len(block) > 2 * _LOAD:
+                self._split(k)
+        else:
+            self._bump(k, -1)
+
+    # -- mutation -----------------------------------------------------------
+
+    def add(self, value):
+        'Insert value at its sorted position, after any equal items.'
+        lists = self._lists
+        maxes = self._maxes
+        if not maxes:
+            lists.append([value])
+            maxes.append(value)
+            self._len = 1
+            self._index = None
+            return
+        k = bisect.bisect_right(maxes, value)
+        if k == len(maxes):
+            k -= 1
+            lists[k].append(value)
+            maxes[k] = value
+        else:
+            bisect.insort(lists[k], value)
+        self._len += 1
+        self._bump(k, 1)
+        if len(lists[k]) > 2 * _LOAD:
+            self._split(k)
+
+    def update(self, iterable):
+        'Add every item of iterable.'
+        values = sorted(iterable)
+        if not values:
+            return
+        if len(values) * 4 >= self._len:
+            values.extend(self)
+            values.sort()
+            self._reset(values)
+        else:
+            for value in values:
+                self.add(value)
+
+    def discard(self, value):
+        'Remove one occurrence of value, if present.'
+        maxes = self._maxes
+        k = bisect.bisect_left(maxes, value)
+        if k == len(maxes):
+            return False
+        block = self._lists[k]
+        j = bisect.bisect_left(block, value)
+        if block[j] != value:
+            return False
+        self._delete(k, j)
+        return True
+
+    def remove(self, value):
+        'Remove one occurrence of value. Raise ValueError if absent.'
+        if not self.discard(value):
+            raise ValueError(f'{value!r} not in list')
+
+    def pop(self, index=-1):
+        'Remove and return the item at index (default last).'
+        if not self._len:
+            raise IndexError('pop from empty list')
+        value = self[index]
+        del self[index]
+        return value
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            positions = range(start, stop, step)
+            if len(positions) < _LOAD:
+                for i in sorted(positions, reverse=True):
+                    self._delete(*self._locate(i))
+            else:
+                values = list(self)
+                del values[index]
+                self._reset(values)
+            return
+        n = self._len
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('list index out of range')
+        self._delete(*self._locate(index))
+
+    # -- read interface -----------------------------------------------------
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step == 1:
+                return list(self.islice(start, stop))
+            return list(self)[index]
+        n = self._len
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('list index out of range')
+        k, j = self._locate(index)
+        return self._lists[k][j]
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._lists)
+
+    def __reversed__(self):
+        return itertools.chain.from_iterable(map(reversed, reversed(self._lists)))
+
+    def __contains__(self, value):
+        maxes = self._maxes
+        k = bisect.bisect_left(maxes, value)
+        if k == len(maxes):
+            return False
+        block = self._lists[k]
+        return block[bisect.bisect_left(block, value)] == value
+
+    def bisect_left(self, value):
+        'Return the position where value would be inserted before equal items.'
+        maxes = self._maxes
+        k = bisect.bisect_left(maxes, value)
+        if k == len(maxes):
+            return self._len
+        return self._position(k, bisect.bisect_left(self._lists[k], value))
+
+    def bisect_right(self, value):
+        'Return the position where value would be inserted after equal items.'
+        maxes = self._maxes
+        k = bisect.bisect_right(maxes, value)
+        if k == len(maxes):
+            return self._len
+        return self._position(k, bisect.bisect_right(self._lists[k], value))
+
+    def count(self, value):
+        'Return number of occurrences of value.'
+        return self.bisect_right(value) - self.bisect_left(value)
+
+    def index(self, value, start=0, stop=None):
+        '''Return first index of value.
+
+        Raises ValueError if the value is not present.
+        '''
+        start, stop, _ = slice(start, stop).indices(self._len)
+        left = self.bisect_left(value)
+        if left == self._len or self[left] != value:
+            raise ValueError(f'{value!r} is not in list')
+        if left < start:
+            left = start
+        if left >= stop or left >= self.bisect_right(value):
+            raise ValueError(f'{value!r} is not in list')
+        return left
+
+    def islice(self, start=None, stop=None, reverse=False):
+        'Iterate the items at positions start..stop-1 without copying.'
+        start, stop, _ = slice(start, stop).indices(self._len)
+        if start >= stop:
+            return iter(())
+        if reverse:
+            return self._iter_reversed(start, stop)
+        return self._iter_range(start, stop)
+
+    def _iter_range(self, start, stop):
+        k, j = self._locate(start)
+        remaining = stop - start
+        for block in itertools.islice(self._lists, k, None):
+            yield from itertools.islice(block, j, j + remaining)
+            remaining -= len(block) - j
+            if remaining <= 0:
+                return
+            j = 0
+
+    def _iter_reversed(self, start, stop):
+        k, j = self._locate(stop - 1)
+        remaining = stop - start
+        lists = self._lists
+        while remaining > 0:
+            block = lists[k]
+            lo = max(j + 1 - remaining, 0)
+            yield from reversed(block[lo:j + 1])
+            remaining -= j + 1 - lo
+            k -= 1
+            j = len(lists[k]) - 1
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        '''Iterate the items between minimum and maximum.
+
+        None for either bound leaves that side open. inclusive is a pair of
+        flags that say whether each bound is itself included.
+        '''
+        if minimum is None:
+            start = 0
+        elif inclusive[0]:
+            start = self.bisect_left(minimum)
+        else:
+            start = self.bisect_right(minimum)
+        if maximum is None:
+            stop = self._len
+        elif inclusive[1]:
+            stop = self.bisect_right(maximum)
+        else:
+            stop = self.bisect_left(maximum)
+        return self.islice(start, stop, reverse)
+
+    def copy(self):
+        'Return a shallow copy of the list.'
+        new = type(self)()
+        new._reset(list(self))
+        return new
+
+    __copy__ = copy
+
+    def __eq__(self, other):
+        if not isinstance(other, collections.abc.Sequence):
+            return NotImplemented
+        return self._len == len(other) and all(map(operator.eq, self, other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self)!r})'
+
+
+'''
+TypedList
+A list of numbers (or single characters) stored in one contiguous typed buffer,
+instead of an array of pointers to separately allocated objects.
+
+For a list of ints or floats, list.__sizeof__ above counts only the pointer
+array, 8 bytes per item, but each item is also a boxed object of 24 to 32
+bytes. TypedList(typecode, iterable) stores the raw values, using any array
+module typecode ('b', 'i', 'q', 'd', 'f', 'u', ...). A TypedList('q') of
+10**7 ints takes 80 MB, where the list and its ints take about 360 MB.
+__sizeof__ reports the object plus its whole allocated buffer, so
+sys.getsizeof() tells the truth. nbytes is the size of the values alone.
+
+TypedList supports the whole mutable sequence interface of list, with the same
+signatures: append, extend, insert, pop, remove, index, count, clear, copy,
+reverse and sort(key=None, reverse=False). It also supports indexing, slicing,
+slice assignment and deletion, +, +=, * and *=, and comparisons, and it
+compares equal to a list or tuple of equal values. Slices, copies and
+concatenations are TypedLists of the same typecode. Values that do not fit the
+typecode raise TypeError or OverflowError as array.array does.
+
+memoryview() returns a zero-copy view of the buffer for NumPy, struct, file
+writes or another process. On Python 3.12 and later, memoryview(tl) and other
+buffer consumers work directly. As with array.array, the list cannot change size
+while a view is held.
+
+sort() without a key uses NumPy, when it is installed, to sort the buffer in
+place. With a key it sorts through boxed values and is stable, like list.sort.
+
+>>> tl = TypedList('i', [3, 1, 2])
+>>> tl += [5]
+>>> tl.sort(reverse=True)
+>>> tl
+TypedList('i', [5, 3, 2, 1])
+>>> tl[1:3], tl.nbytes
+(TypedList('i', [3, 2]), 16)
+>>> view = tl.memoryview()
+>>> view[0] = 9
+>>> tl[0]
+9
+'''
+
+
+class TypedList(collections.abc.MutableSequence):
+    'List of fixed-width values stored in a contiguous typed buffer.'
+
+    __slots__ = ('_data',)
+
+    def __init__(self, typecode='d', iterable=()):
+        if isinstance(iterable, TypedList):
+            iterable = iterable._data
+        self._data = array.array(typecode, iterable)
+
+    @classmethod
+    def _wrap(cls, data):
+        new = cls.__new__(cls)
+        new._data = data
+        return new
+
+    def _coerce(self, values):
+        "Return values as an array of this list's typecode."
+        if isinstance(values, TypedList):
+            values = values._data
+        if isinstance(values, array.array) and values.typecode == self._data.typecode:
+            return values
+        return array.array(self._data.typecode, values)
+
+    @property
+    def typecode(self):
+        return self._data.typecode
+
+    @property
+    def itemsize(self):
+        return self._data.itemsize
+
+    @property
+    def nbytes(self):
+        'Size of the stored values in bytes.'
+        return len(self._data) * self._data.itemsize
+
+    def memoryview(self):
+        'Return a zero-copy memoryview of the buffer.'
+        return memoryview(self._data)
+
+    def __buffer__(self, flags):
+        return memoryview(self._data)
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self._data.__sizeof__()
+
+    # -- sequence interface -------------------------------------------------
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._wrap(self._data[index])
+        return self._data[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = self._coerce(value)
+        self._data[index] = value
+
+    def __delitem__(self, index):
+        del self._data[index]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __reversed__(self):
+        return reversed(self._data)
+
+    def __contains__(self, value):
+        return value in self._data
+
+    def append(self, value):
+        'Append object to the end of the list.'
+        self._data.append(value)
+
+    def extend(self, iterable):
+        'Extend list by appending elements from the iterable.'
+        self._data.extend(self._coerce(iterable))
+
+    def insert(self, index, value):
+        'Insert object before index.'
+        self._data.insert(index, value)
+
+    def pop(self, index=-1):
+        '''Remove and return item at index (default last).
+
+        Raises IndexError if list is empty or index is out of range.
+        '''
+        if not self._data:
+            raise IndexError('pop from empty list')
+        return self._data.pop(index)
+
+    def remove(self, value):
+        '''Remove first occurrence of value.
+
+        Raises ValueError if the value is not present.
+        '''
+        try:
+            self._data.remove(value)
+        except ValueError:
+            raise ValueError('list.remove(x): x not in list') from None
+
+    def index(self, value, start=0, stop=sys.maxsize):
+        '''Return first index of value.
+
+        Raises ValueError if the value is not present.
+        '''
+        try:
+            return self._data.index(value, start, stop)
+        except ValueError:
+            raise ValueError(f'{value!r} is not in list') from None
+
+    def count(self, value):
+        'Return number of occurrences of value.'
+        return self._data.count(value)
+
+    def clear(self):
+        'Remove all items from list.'
+        del self._data[:]
+
+    def copy(self):
+        'Return a shallow copy of the list.'
+        return self._wrap(self._data[:])
+
+    __copy__ = copy
+
+    def reverse(self):
+        'Reverse *IN PLACE*.'
+        self._data.reverse()
+
+    def sort(self, *, key=None, reverse=False):
+        '''Sort the list in ascending order and return None.
+
+        The sort is in-place (i.e. the list itself is modified) and stable (i.e. the
+        order of two equal elements is maintained).
+
+        If a key function is given, apply it once to each list item and sort them,
+        ascending or descending, according to their function values.
+
+        The reverse flag can be set to sort in descending order.
+        '''
+        data = self._data
+        if key is None and np is not None and data.typecode not in 'uw':
+            values = np.frombuffer(data, dtype=data.typecode)
+            values.sort(kind='stable')
+            del values
+            if reverse:
+                # Equal values are indistinguishable, so this is still stable.
+                data.reverse()
+        else:
+            data[:] = array.array(data.typecode, sorted(data, key=key, reverse=reverse))
+
+    # -- operators ----------------------------------------------------------
+
+    def __add__(self, other):
+        if not isinstance(other, (TypedList, array.array, list)):
+            return NotImplemented
+        return self._wrap(self._data + self._coerce(other))
+
+    def __iadd__(self, other):
+        self._data += self._coerce(other)
+        return self
+
+    def __mul__(self, n):
+        return self._wrap(self._data * n)
+
+    __rmul__ = __mul__
+
+    def __imul__(self, n):
+        self._data *= n
+        return self
+
+    def _other(self, other):
+        if isinstance(other, TypedList):
+            return other._data
+        if isinstance(other, array.array):
+            return other
+        return None
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple)):
+            data = self._data
+            return len(data) == len(other) and all(map(operator.eq, data, other))
+        other = self._other(other)
+        return NotImplemented if other is None else self._data == other
+
+    def __lt__(self, other):
+        other = self._other(other)
+        return NotImplemented if other is None else self._data < other
+
+    def __le__(self, other):
+        other = self._other(other)
+        return NotImplemented if other is None else self._data <= other
+
+    def __gt__(self, other):
+        other = self._other(other)
+        return NotImplemented if other is None else self._data > other
+
+    def __ge__(self, other):
+        other = self._other(other)
+        return NotImplemented if other is None else self._data >= other
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return type(self), (self._data.typecode, self._data)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._data.typecode!r}, {self._data.tolist()!r})'
+
+
+'''
+IndexedList
+A list that can keep a side index from each value to its positions, so that
+x in lst, lst.count(x), lst.index(x) and lst.remove(x) do not scan.
+
+IndexedList is a list subclass, so reads, iteration and slicing run at list
+speed. The index is opt-in: IndexedList(iterable, indexed=True) builds it, and
+build_index() and drop_index() switch it on and off later. Without the index,
+every method behaves as it does for list, at a small extra cost per call.
+With it, the values must be hashable, and equality is dict equality, which
+matches list equality for all the usual value types.
+
+The index numbers each item by arrival and maps each value to the sorted
+numbers of its items. Deleted numbers are counted in a Fenwick tree, so an
+item's position is its number minus the deletions before it. in and count()
+are O(1). append, extend, pop, remove, del, item assignment and same-length
+slice assignment update the index in O(log n), and index() is O(log n).
+Inserting in the middle (insert, slice assignment that grows the list)
+and reverse() and sort() change too many positions to patch, so they mark the
+index out of date. The next lookup by value rebuilds it in one O(n) pass.
+
+index_sizeof() reports what the index costs in bytes (its dict, position lists,
+Fenwick tree and boxed ints), and sys.getsizeof() includes it.
+
+>>> lst = IndexedList('abcab', indexed=True)
+>>> 'c' in lst, lst.count('a'), lst.index('b', 2)
+(True, 2, 4)
+>>> lst.remove('a')
+>>> lst.append('d')
+>>> lst, lst.index('a')
+(IndexedList(['b', 'c', 'a', 'b', 'd']), 2)
+'''
+
+
+class IndexedList(list):
+    'List with an optional value -> positions index for fast lookups by value.'
+
+    __slots__ = ('_positions', '_tree', '_dead', '_stale')
+
+    def __init__(self, iterable=(), indexed=False):
+        list.__init__(self, iterable)
+        self._positions = None
+        self._tree = None
+        self._dead = 0
+        self._stale = False
+        if indexed:
+            self.build_index()
+
+    # -- the side index -----------------------------------------------------
+
+    @property
+    def indexed(self):
+        return self._positions is not None
+
+    def build_index(self):
+        'Build (or rebuild) the value index.'
+        positions = {}
+        for i, value in enumerate(self):
+            positions.setdefault(value, []).append(i)
+        self._positions = positions
+        self._tree = [0] * (len(self) + 1)
+        self._dead = 0
+        self._stale = False
+
+    def drop_index(self):
+        'Discard the value index and free its memory.'
+        self._positions = None
+        self._tree = None
+        self._dead = 0
+        self._stale = False
+
+    def index_sizeof(self):
+        'Return the memory used by the value index, in bytes.'
+        if self._positions is None:
+            return 0
+        size = sys.getsizeof(self._positions) + sys.getsizeof(self._tree)
+        size += sum(sys.getsizeof(n) for n in self._tree if n > 256)
+        for numbers in self._positions.values():
+            size += sys.getsizeof(numbers)
+            size += sum(sys.getsizeof(n) for n in numbers if n > 256)
+        return size
+
+    def __sizeof__(self):
+        return list.__sizeof__(self) + self.index_sizeof()
+
+    def _fresh(self):
+        'Return the value index, rebuilding it first if it is out of date.'
+        if self._stale:
+            self.build_index()
+        return self._positions
+
+    def _rank(self, number):
+        'Return the current position of the item numbered number.'
+        tree = self._tree
+        i = number
+        while i:
+            number -= tree[i]
+            i &= i - 1
+        return number
+
+    def _find(self, numbers, i):
+        'Return the offset in numbers of the item at position i.'
+        if self._dead:
+            return bisect.bisect_left(numbers, i, key=self._rank)
+        return bisect.bisect_left(numbers, i)
+
+    def _number(self, value):
+        'Number a new item at the end of the list and return the number.'
+        tree = self._tree
+        j = len(tree)
+        low = j - (j & -j)
+        count = 0
+        i = j - 1
+        while i > low:
+            count += tree[i]
+            i &= i - 1
+        tree.append(count)
+        self._positions.setdefault(value, []).append(j - 1)
+
+    def _forget(self, value, i):
+        'Remove the index entry of value, which was at position i.'
+        positions = self._positions
+        numbers = positions[value]
+        number = numbers.pop(self._find(numbers, i))
+        if not numbers:
+            del positions[value]
+        tree = self._tree
+        j = number + 1
+        while j < len(tree):
+            tree[j] += 1
+            j += j & -j
+        self._dead += 1
+
+    def _compact(self):
+        'Renumber the items once deleted numbers outnumber live ones.'
+        if self._dead > len(self) and self._dead > 64:
+            self.build_index()
+
+    def _replace(self, old, value, i):
+        'Move the index entry at position i from value old to value.'
+        positions = self._positions
+        numbers = positions[old]
+        number = numbers.pop(self._find(numbers, i))
+        if not numbers:
+            del positions[old]
+        bisect.insort(positions.setdefault(value, []), number)
+
+    # -- lookups by value ---------------------------------------------------
+
+    def __contains__(self, value):
+        if self._positions is None:
+            return list.__contains__(self, value)
+        return value in self._fresh()
+
+    def count(self, value):
+        'Return number of occurrences of value.'
+        if self._positions is None:
+            return list.count(self, value)
+        return len(self._fresh().get(value, ()))
+
+    def index(self, value, start=0, stop=sys.maxsize):
+        '''Return first index of value.
+
+        Raises ValueError if the value is not present.
+        '''
+        if self._positions is None:
+            return list.index(self, value, start, stop)
+        start, stop, _ = slice(start, stop).indices(len(self))
+        numbers = self._fresh().get(value)
+        if numbers:
+            k = self._find(numbers, start)
+            if k < len(numbers):
+                i = self._rank(numbers[k])
+                if i < stop:
+                    return i
+        raise ValueError(f'{value!r} is not in list')
+
+    def remove(self, value):
+        '''Remove first occurrence of value.
+
+        Raises ValueError if the value is not present.
+        '''
+        if self._positions is None:
+            return list.remove(self, value)
+        try:
+            i = self.index(value)
+        except ValueError:
+            raise ValueError('list.remove(x): x not in list') from None
+        del self[i]
+
+    # -- mutation -----------------------------------------------------------
+
+    def append(self, value):
+        'Append object to the end of the list.'
+        list.append(self, value)
+        if self._positions is not None and not self._stale:
+            self._number(value)
+
+    def extend(self, iterable):
+        'Extend list by appending elements from the iterable.'
+        if self._positions is None or self._stale:
+            return list.extend(self, iterable)
+        for value in iterable:
+            list.append(self, value)
+            self._number(value)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __imul__(self, n):
+        if self._positions is None:
+            return list.__imul__(self, n)
+        if n <= 0:
+            self.clear()
+        else:
+            self.extend(list(self) * (n - 1))
+        return self
+
+    def insert(self, index, value):
+        'Insert object before index.'
+        if self._positions is not None and index >= len(self):
+            self.append(value)
+            return
+        list.insert(self, index, value)
+        if self._positions is not None:
+            self._stale = True
+
+    def pop(self, index=-1):
+        '''Remove and return item at index (default last).
+
+        Raises IndexError if list is empty or index is out of range.
+        '''
+        value = list.pop(self, index)
+        if self._positions is not None and not self._stale:
+            self._forget(value, index + len(self) + 1 if index < 0 else index)
+            self._compact()
+        return value
+
+    def __setitem__(self, index, value):
+        if self._positions is None:
+            return list.__setitem__(self, index, value)
+        if not isinstance(index, slice):
+            old = list.__getitem__(self, index)
+            list.__setitem__(self, index, value)
+            if not self._stale:
+                self._replace(old, value, index + len(self) if index < 0 else index)
+            return
+        n = len(self)
+        start, stop, step = index.indices(n)
+        value = list(value)
+        changed = range(start, stop, step)
+        if step == 1 and start == n:
+            self.extend(value)
+        elif len(changed) == len(value) and not self._stale:
+            old = list.__getitem__(self, index)
+            list.__setitem__(self, index, value)
+            for i, old_value, new_value in zip(changed, old, value):
+                self._replace(old_value, new_value, i)
+        else:
+            list.__setitem__(self, index, value)
+            self._stale = True
+
+    def __delitem__(self, index):
+        if self._positions is None:
+            return list.__delitem__(self, index)
+        if not isinstance(index, slice):
+            self.pop(index)
+            return
+        changed = range(*index.indices(len(self)))
+        old = list.__getitem__(self, index)
+        list.__delitem__(self, index)
+        if not self._stale:
+            # Forget from the highest position down, so the positions still
+            # to be forgotten do not move.
+            for i, value in sorted(zip(changed, old), key=operator.itemgetter(0), reverse=True):
+                self._forget(value, i)
+            self._compact()
+
+    def clear(self):
+        'Remove all items from list.'
+        list.clear(self)
+        if self._positions is not None:
+            self.build_index()
+
+    def reverse(self):
+        'Reverse *IN PLACE*.'
+        list.reverse(self)
+        if self._positions is not None:
+            self._stale = True
+
+    def sort(self, *, key=None, reverse=False):
+        '''Sort the list in ascending order and return None.
+
+        The sort is in-place (i.e. the list itself is modified) and stable (i.e. the
+        order of two equal elements is maintained).
+
+        If a key function is given, apply it once to each list item and sort them,
+        ascending or descending, according to their function values.
+
+        The reverse flag can be set to sort in descending order.
+        '''
+        list.sort(self, key=key, reverse=reverse)
+        if self._positions is not None:
+            self._stale = True
+
+    def copy(self):
+        'Return a shallow copy of the list.'
+        return type(self)(self, self.indexed)
+
+    __copy__ = copy
+
+    def __reduce__(self):
+        return type(self), (list(self), self.indexed)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list.__repr__(self)})'
+
+'''
+parallel_sort
+parallel_sort(iterable, *, key=None, reverse=False, workers=None,
+chunk_size=1 << 16, threads=False) returns the same new list as
+sorted(iterable, key=key, reverse=reverse), but evaluates key and sorts on
+several cores.
+
+The input is cut into contiguous chunks of chunk_size items. A worker takes one
+chunk, calls key once per item, sorts the chunk by the cached keys, and returns
+the sorted keys and the permutation, not the items. The parent reorders its own
+copy of each chunk and merges the runs with heapq.merge, comparing only cached
+keys. list.sort is stable and so is heapq.merge (on equal keys it takes the
+earlier run first), and every chunk is sorted with the same reverse flag, so
+equal items keep their input order in both directions, as the sort() docstring
+above promises.
+
+Workers are processes by default, so key (and the items) must be picklable.
+threads=True uses a thread pool instead, for keys that are not picklable or
+that release the GIL. workers=1 sorts in the calling process.
+
+iter_sorted(iterable, *, key=None, reverse=False, workers=None,
+chunk_size=1 << 16, run_size=10**6, threads=False, tmpdir=None) is the
+version for inputs larger than memory. It reads run_size items at a time,
+sorts each run as parallel_sort does, and writes it with its cached keys to a
+temporary file in tmpdir. It then yields the sorted items from a k-way merge
+of the files, so memory use stays near one run. An input that fits in a single
+run is never written to disk.
+
+>>> parallel_sort(['b1', 'a2', 'b3', 'a4'], key=operator.itemgetter(0), reverse=True, workers=1, chunk_size=2)
+['b1', 'b3', 'a2', 'a4']
+>>> list(iter_sorted(range(10, 0, -1), workers=1, chunk_size=2, run_size=4))
+[1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+'''
+
+_SPILL_BATCH = 4096
+
+
+def _sort_chunk(task):
+    'Sort one chunk by its keys; return (sorted keys, permutation).'
+    items, key, reverse = task
+    keys = items if key is None else list(map(key, items))
+    order = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+    return [keys[i] for i in order], order
+
+
+def _pool(workers, threads):
+    if workers == 1:
+        return contextlib.nullcontext(types.SimpleNamespace(map=map))
+    if threads:
+        return concurrent.futures.ThreadPoolExecutor(workers)
+    return concurrent.futures.ProcessPoolExecutor(workers)
+
+
+def _sorted_pairs(items, key, reverse, pool, chunk_size):
+    'Return an iterator of (key, item) pairs over items in sorted order.'
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    results = pool.map(_sort_chunk, [(chunk, key, reverse) for chunk in chunks])
+    runs = [zip(keys, map(chunk.__getitem__, order))
+            for chunk, (keys, order) in zip(chunks, results)]
+    if len(runs) == 1:
+        return runs[0]
+    return heapq.merge(*runs, key=operator.itemgetter(0), reverse=reverse)
+
+
+def parallel_sort(iterable, *, key=None, reverse=False, workers=None,
+                  chunk_size=1 << 16, threads=False):
+    'Return a new sorted list, evaluating keys and sorting chunks in a pool.'
+    items = list(iterable)
+    with _pool(workers, threads) as pool:
+        pairs = _sorted_pairs(items, key, reverse, pool, chunk_size)
+        return list(map(operator.itemgetter(1), pairs))
+
+
+def _read_run(f):
+    f.seek(0)
+    while True:
+        try:
+            batch = pickle.load(f)
+        except EOFError:
+            return
+        yield from batch
+
+
+def iter_sorted(iterable, *, key=None, reverse=False, workers=None,
+                chunk_size=1 << 16, run_size=10**6, threads=False, tmpdir=None):
+    'Yield the items of iterable in sorted order, spilling sorted runs to disk.'
+    it = iter(iterable)
+    files = []
+    result = ()
+    try:
+        with _pool(workers, threads) as pool:
+            while True:
+                items = list(itertools.islice(it, run_size))
+                if not items:
+                    break
+                pairs = _sorted_pairs(items, key, reverse, pool, chunk_size)
+                if not files and len(items) < run_size:
+                    result = list(map(operator.itemgetter(1), pairs))
+                    break
+                f = tempfile.TemporaryFile(dir=tmpdir)
+                files.append(f)
+                while batch := list(itertools.islice(pairs, _SPILL_BATCH)):
+                    pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+                del items, pairs
+        if not files:
+            yield from result
+            return
+        merged = heapq.merge(*map(_read_run, files), key=operator.itemgetter(0), reverse=reverse)
+        yield from map(operator.itemgetter(1), merged)
+    finally:
+        for f in files:
+            f.close()
+
+
+def bench_sorted_list(n=10**6, ops=200):
+    'Compare keeping 10**6 items sorted with list.sort(), bisect.insort and SortedList.'
+    rng = random.Random(0)
+    base = [rng.random() for _ in range(n)]
+    new = [rng.random() for _ in range(ops)]
+
+    lst = sorted(base)
+    t0 = time.perf_counter()
+    for x in new:
+        lst.append(x)
+        lst.sort()
+    t1 = time.perf_counter()
+    print(f'append+sort     {(t1 - t0) / ops * 1e6:10.2f} us/add')
+
+    lst = sorted(base)
+    t0 = time.perf_counter()
+    for x in new:
+        bisect.insort(lst, x)
+    t1 = time.perf_counter()
+    for x in new:
+        lst.remove(x)
+    t2 = time.perf_counter()
+    print(f'bisect.insort   {(t1 - t0) / ops * 1e6:10.2f} us/add  '
+          f'list.remove {(t2 - t1) / ops * 1e6:10.2f} us')
+
+    sl = SortedList(base)
+    t0 = time.perf_counter()
+    for x in new:
+        sl.add(x)
+    t1 = time.perf_counter()
+    for x in new:
+        sl.remove(x)
+    t2 = time.perf_counter()
+    for i in range(0, n, n // ops):
+        sl[i]
+    t3 = time.perf_counter()
+    for x in new:
+        for _ in sl.irange(x, x + 1e-5):
+            pass
+    t4 = time.perf_counter()
+    print(f'SortedList.add  {(t1 - t0) / ops * 1e6:10.2f} us/add  '
+          f'remove {(t2 - t1) / ops * 1e6:10.2f} us  '
+          f'getitem {(t3 - t2) / ops * 1e6:8.2f} us  '
+          f'irange {(t4 - t3) / ops * 1e6:8.2f} us')
+
+
+def bench_typed_list(n=10**7):
+    'Compare memory and speed of list and TypedList with 10**7 ints.'
+    import gc
+    import tracemalloc
+    for name, make in (('list', lambda: list(range(n))),
+                       ('TypedList', lambda: TypedList('q', range(n)))):
+        gc.collect()
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        values = make()
+        t1 = time.perf_counter()
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        t2 = time.perf_counter()
+        sum(values)
+        t3 = time.perf_counter()
+        values.index(n - 1)
+        t4 = time.perf_counter()
+        values.reverse()
+        values.sort()
+        t5 = time.perf_counter()
+        print(f'{name:>9} traced {used / 2**20:7.1f} MiB  getsizeof {sys.getsizeof(values) / 2**20:7.1f} MiB  '
+              f'build {(t1 - t0) * 1e3:7.1f} ms  sum {(t3 - t2) * 1e3:7.1f} ms  '
+              f'index {(t4 - t3) * 1e3:7.1f} ms  sort {(t5 - t4) * 1e3:7.1f} ms')
+        del values
+
+
+def bench_indexed_list(n=10**6, ops=200):
+    'Compare lookups by value on list and IndexedList, and report index memory.'
+    rng = random.Random(0)
+    values = [rng.randrange(n) for _ in range(n)]
+    probes = [rng.randrange(n) for _ in range(ops)]
+    for name, lst in (('list', list(values)), ('IndexedList', IndexedList(values, indexed=True))):
+        t0 = time.perf_counter()
+        for x in probes:
+            x in lst
+        t1 = time.perf_counter()
+        for x in probes:
+            lst.count(x)
+        t2 = time.perf_counter()
+        for x in probes:
+            lst.append(x)
+            lst.remove(x)
+        t3 = time.perf_counter()
+        extra = lst.index_sizeof() if isinstance(lst, IndexedList) else 0
+        print(f'{name:>11} in {(t1 - t0) / ops * 1e6:9.2f} us  count {(t2 - t1) / ops * 1e6:9.2f} us  '
+              f'append+remove {(t3 - t2) / ops * 1e6:9.2f} us  index overhead {extra / 2**20:6.1f} MiB')
+
+
+def _parse_timestamp(record):
+    return datetime.datetime.strptime(record[:19], '%Y-%m-%dT%H:%M:%S')
+
+
+def bench_parallel_sort(n=10**6, max_workers=None):
+    'Time parallel_sort with an expensive key on 1 to max_workers processes.'
+    max_workers = max_workers or os.cpu_count()
+    rng = random.Random(0)
+    start = datetime.datetime(2024, 1, 1)
+    records = [f'{start + datetime.timedelta(seconds=rng.randrange(10**7)):%Y-%m-%dT%H:%M:%S} event {i}'
+               for i in range(n)]
+    t0 = time.perf_counter()
+    expected = sorted(records, key=_parse_timestamp)
+    baseline = time.perf_counter() - t0
+    print(f'list.sort     {baseline:7.2f} s')
+    workers = 1
+    while workers <= max_workers:
+        t0 = time.perf_counter()
+        result = parallel_sort(records, key=_parse_timestamp, workers=workers)
+        elapsed = time.perf_counter() - t0
+        assert result == expected
+        print(f'workers={workers:<3} {elapsed:7.2f} s  speedup {baseline / elapsed:5.2f}x')
+        workers *= 2
+
+
+if __name__ == '__main__':
+    bench_sorted_list()
+    bench_typed_list()
+    bench_indexed_list()
+    bench_parallel_sort()
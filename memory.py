@@ -0,0 +1,412 @@
+'''
+memory
+Deep memory accounting for the collections in this package and in collections.
+
+sys.getsizeof() and the __sizeof__ methods in dict.py and list.py report the
+shallow size of a container. They count its own table or pointer array, but
+not the keys, values and items it refers to. This module adds up everything a
+collection keeps alive.
+
+deep_sizeof(obj) walks everything reachable from obj with gc.get_referents (plus
+the keys of dicts, which the garbage collector skips when they are all str) and
+adds up the shallow size of each object once, keyed by id. Shared references
+and cycles are counted once. Classes, modules, functions and methods are not
+counted, since they belong to the program rather than to the data. Each object
+is measured with the __sizeof__ of the nearest built-in base, not with a
+Python-level override. Overrides such as TypedList.__sizeof__ already include
+the parts they own, and the walker counts those parts itself. Files mapped by
+MmapDict live in the page cache and are not counted.
+
+memory_report(objects=None) returns a MemoryReport that breaks memory down
+by collection type. With no argument, it finds every live instance of the
+collection types in this package and in collections (deque, Counter,
+OrderedDict, defaultdict, ChainMap, UserDict, UserList, UserString and named
+tuples) through gc.get_objects(). Named tuples holding only atomic values are
+not tracked by the garbage collector, so they are found only through the
+containers that hold them. The stdlib containers that a collection from this
+package is built from, such as the OrderedDict shards of an LRUCache or the
+deque of blocks in a BlockDeque, are part of it and are not reported on their
+own. A collection stored in another one as data, such as an OrderedDict cached
+as a value in an LRUCache, is reported under its own type.
+
+objects may also be an iterable of objects, each reported under its type, or a
+mapping of labels to objects, each reported under its label. Objects passed in
+are always reported, even when one of them is part of another. Each
+collection is charged for what it reaches without going through another
+collection in the report. An object shared by two collections is charged to
+whichever is walked first. Collections are walked in order of type name, or
+of label, so the split is the same from run to run.
+
+allocation_profile(limit=20, key_type='lineno', frames=1) is a context manager
+that takes tracemalloc snapshots before and after a block. It yields an
+AllocationProfile, which is filled in when the block exits with the net
+allocation by source location, the net total and the peak.
+
+Both report classes have to_dict(), to_json() and format(). Their output is
+sorted and stable, so reports saved from two releases can be compared with
+diff. compare_reports(old, new) compares two MemoryReports, or their saved
+JSON dicts, and returns the change for each collection type.
+
+>>> import collections
+>>> deep_sizeof(['a' * 100]) > sys.getsizeof(['a' * 100])
+True
+>>> report = memory_report({'cache': collections.OrderedDict.fromkeys(range(1000))})
+>>> report.groups['cache']['objects']
+1
+>>> from dict import FrozenDict
+>>> from OrderedDict import LRUCache
+>>> payload = collections.deque(range(1000))
+>>> sorted(memory_report({'fd': FrozenDict({'a': payload}), 'payload': payload}).groups)
+['fd', 'payload']
+>>> lru, cached = LRUCache(), collections.OrderedDict.fromkeys(range(1000))
+>>> lru.put('key', cached)
+>>> groups = memory_report([lru, cached]).groups
+>>> groups['collections.OrderedDict']['bytes'] > groups['OrderedDict.LRUCache']['bytes']
+True
+>>> with allocation_profile() as profile:
+...     data = [bytes(1000) for _ in range(100)]
+>>> profile.total >= 100 * 1000
+True
+'''
+
+import contextlib
+import gc
+import importlib
+import json
+import sys
+import time
+import tracemalloc
+import types
+
+_HAVE_GC = 1 << 14                      # Py_TPFLAGS_HAVE_GC
+_GC_HEADER = sys.getsizeof([]) - [].__sizeof__()
+_SHARED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+           types.MethodType, types.CodeType, types.FrameType)
+
+_STDLIB_TYPES = ('deque', 'Counter', 'OrderedDict', 'defaultdict', 'ChainMap',
+                 'UserDict', 'UserList', 'UserString')
+_PACKAGE_TYPES = {
+    'deque': ('BlockDeque', 'BlockDequeView', 'NumericDeque', 'AsyncDeque'),
+    'OrderedDict': ('LRUCache', 'IndexedOrderedDict'),
+    'ChainMap': ('VersionedDict', 'CachedChainMap', 'PersistentMap', 'PersistentChainMap'),
+    'Counter': ('HeavyHitters', 'RankedCounter'),
+    'defaultdict': ('GroupAccumulator',),
+    'namedtuple': ('RecordBatch',),
+    'list': ('SortedList', 'TypedList', 'IndexedList'),
+    'dict': ('FrozenDict', 'MmapDict'),
+    'UserDict': ('InstrumentedUserDict',),
+    'UserList': ('InstrumentedUserList',),
+}
+# The attributes through which a package collection holds the stdlib
+# containers it is built from. Everything else it holds is data.
+_STRUCTURE = {
+    'BlockDeque': ('_blocks',),
+    'NumericDeque': ('_minq', '_maxq'),
+    'AsyncDeque': ('_items', '_getters', '_putters'),
+    'LRUCache': ('_shards',),
+}
+
+
+def _shallow_sizeof(obj):
+    'Return sys.getsizeof(obj), using the __sizeof__ of the nearest built-in class.'
+    cls = type(obj)
+    for klass in cls.__mro__:
+        method = klass.__dict__.get('__sizeof__')
+        if method is not None and not isinstance(method, types.FunctionType):
+            break
+    size = method(obj)
+    if cls.__flags__ & _HAVE_GC:
+        size += _GC_HEADER
+    return size
+
+
+def _walk(obj, seen, stop=frozenset(), by_type=None):
+    '''Return the size of obj and everything it reaches that is not in seen.
+
+    Objects whose ids are in stop are neither counted nor entered. Every object
+    counted is added to seen, and to by_type if given.
+    '''
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        i = id(o)
+        if i in seen or isinstance(o, _SHARED):
+            continue
+        seen.add(i)
+        size = _shallow_sizeof(o)
+        total += size
+        if by_type is not None:
+            name = _type_name(type(o))
+            entry = by_type.get(name)
+            if entry is None:
+                by_type[name] = [1, size]
+            else:
+                entry[0] += 1
+                entry[1] += size
+        referents = gc.get_referents(o)
+        if isinstance(o, dict):
+            # The garbage collector skips the keys of dicts with only str keys.
+            referents.extend(dict.keys(o))
+        for referent in referents:
+            if id(referent) not in seen and id(referent) not in stop:
+                stack.append(referent)
+    return total
+
+
+def deep_sizeof(obj):
+    'Return the memory used by obj and everything it keeps alive, in bytes.'
+    return _walk(obj, set())
+
+
+def _type_name(cls):
+    if cls.__module__ == 'builtins':
+        return cls.__qualname__
+    return f'{cls.__module__}.{cls.__qualname__}'
+
+
+def _stdlib_types():
+    import collections
+    return tuple(getattr(collections, name) for name in _STDLIB_TYPES)
+
+
+def _package_types():
+    found = []
+    for module_name, names in _PACKAGE_TYPES.items():
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        found.extend(getattr(module, name) for name in names if hasattr(module, name))
+    return tuple(found)
+
+
+def collection_types():
+    'Return the collection classes memory_report() looks for.'
+    return _stdlib_types() + _package_types()
+
+
+def _structure(obj):
+    'Return the attributes through which obj holds the containers it is built from.'
+    for klass in type(obj).__mro__:
+        names = _STRUCTURE.get(klass.__name__)
+        if names is not None:
+            return [getattr(obj, name) for name in names if hasattr(obj, name)]
+    return []
+
+
+def _internal(roots, tracked, stdlib):
+    '''Return the ids of the stdlib containers that roots are built from.
+
+    The walk starts at the structure attributes of each package collection and
+    stops at every tracked collection, so the blocks of a BlockDeque or the
+    shards of an LRUCache are found, but no collection stored in them as data.
+    '''
+    internal = set()
+    seen = set()
+    for _, obj in roots:
+        stack = _structure(obj)
+        while stack:
+            o = stack.pop()
+            i = id(o)
+            if i in seen or isinstance(o, _SHARED):
+                continue
+            seen.add(i)
+            if _group(o, tracked) is not None:
+                if type(o) in stdlib:
+                    internal.add(i)
+                continue
+            stack.extend(gc.get_referents(o))
+    return internal
+
+
+def _group(obj, tracked):
+    'Return the report group of obj, or None if it is not a tracked collection.'
+    cls = type(obj)
+    for klass in cls.__mro__:
+        if klass in tracked:
+            return _type_name(klass)
+    if isinstance(obj, tuple) and hasattr(cls, '_fields'):
+        return f'namedtuple {_type_name(cls)}'
+    return None
+
+
+class MemoryReport:
+    'Deep memory use broken down by collection type.'
+
+    def __init__(self, groups=None):
+        # group -> {'objects': collections, 'bytes': deep size,
+        #           'types': {type name: [objects, bytes]}}
+        self.groups = groups if groups is not None else {}
+
+    @property
+    def total(self):
+        return sum(group['bytes'] for group in self.groups.values())
+
+    def _add(self, name, obj, seen, stop):
+        group = self.groups.get(name)
+        if group is None:
+            group = self.groups[name] = {'objects': 0, 'bytes': 0, 'types': {}}
+        group['objects'] += 1
+        group['bytes'] += _walk(obj, seen, stop, group['types'])
+
+    def to_dict(self):
+        return {'total': self.total,
+                'groups': {name: {'objects': group['objects'], 'bytes': group['bytes'],
+                                  'types': {t: list(v) for t, v in sorted(group['types'].items())}}
+                           for name, group in sorted(self.groups.items())}}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=1, sort_keys=True)
+
+    def format(self, top=5):
+        'Return a text table of the groups, each with its top contained types.'
+        lines = [f'{"collection type":<48} {"objects":>10} {"bytes":>16}']
+        for name, group in sorted(self.groups.items()):
+            lines.append(f'{name:<48} {group["objects"]:>10,} {group["bytes"]:>16,}')
+            ranked = sorted(group['types'].items(), key=lambda item: (-item[1][1], item[0]))
+            for type_name, (count, size) in ranked[:top]:
+                lines.append(f'    {type_name:<44} {count:>10,} {size:>16,}')
+        lines.append(f'{"total":<48} {"":>10} {self.total:>16,}')
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return f'{type(self).__name__}(groups={len(self.groups)}, total={self.total})'
+
+
+def memory_report(objects=None):
+    'Return a MemoryReport for objects, or for every live collection if None.'
+    report = MemoryReport()
+    if objects is None:
+        tracked = frozenset(collection_types())
+        roots = []
+        for obj in gc.get_objects():
+            name = _group(obj, tracked)
+            if name is not None:
+                roots.append((name, obj))
+        internal = _internal(roots, tracked, frozenset(_stdlib_types()))
+        roots = [(name, obj) for name, obj in roots if id(obj) not in internal]
+    elif hasattr(objects, 'items'):
+        roots = [(str(label), obj) for label, obj in objects.items()]
+    else:
+        tracked = frozenset(collection_types())
+        roots = [(_group(obj, tracked) or _type_name(type(obj)), obj) for obj in objects]
+    roots.sort(key=lambda root: root[0])
+    stop = {id(obj) for _, obj in roots}
+    seen = set()
+    for name, obj in roots:
+        stop.discard(id(obj))
+        report._add(name, obj, seen, stop)
+        stop.add(id(obj))
+    return report
+
+
+def compare_reports(old, new):
+    'Return a text table of the change in each group between two reports.'
+    old = old.to_dict() if isinstance(old, MemoryReport) else old
+    new = new.to_dict() if isinstance(new, MemoryReport) else new
+    empty = {'objects': 0, 'bytes': 0}
+    lines = [f'{"collection type":<48} {"objects":>10} {"bytes":>16}']
+    for name in sorted(old['groups'].keys() | new['groups'].keys()):
+        before = old['groups'].get(name, empty)
+        after = new['groups'].get(name, empty)
+        objects = after['objects'] - before['objects']
+        size = after['bytes'] - before['bytes']
+        if objects or size:
+            lines.append(f'{name:<48} {objects:>+10,} {size:>+16,}')
+    lines.append(f'{"total":<48} {"":>10} {new["total"] - old["total"]:>+16,}')
+    return '\n'.join(lines)
+
+
+class AllocationProfile:
+    'Net allocations made during an allocation_profile() block.'
+
+    def __init__(self):
+        self.stats = []         # [{'where': ..., 'bytes': ..., 'blocks': ...}], largest first
+        self.total = 0
+        self.peak = 0
+        self.elapsed = 0.0
+
+    def to_dict(self):
+        return {'total': self.total, 'peak': self.peak, 'elapsed': self.elapsed,
+                'stats': self.stats}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=1, sort_keys=True)
+
+    def format(self):
+        lines = [f'{"where":<60} {"blocks":>10} {"bytes":>14}']
+        for stat in self.stats:
+            lines.append(f'{stat["where"]:<60} {stat["blocks"]:>+10,} {stat["bytes"]:>+14,}')
+        lines.append(f'{"total":<60} {"":>10} {self.total:>+14,}')
+        lines.append(f'{"peak":<60} {"":>10} {self.peak:>14,}')
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return f'{type(self).__name__}(total={self.total}, peak={self.peak})'
+
+
+@contextlib.contextmanager
+def allocation_profile(limit=20, key_type='lineno', frames=1):
+    'Record the net allocations made inside a with block, using tracemalloc.'
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),
+              tracemalloc.Filter(False, __file__))
+    profile = AllocationProfile()
+    before = tracemalloc.take_snapshot().filter_traces(ignore)
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.elapsed = time.perf_counter() - t0
+        profile.peak = tracemalloc.get_traced_memory()[1] - base
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+        if started:
+            tracemalloc.stop()
+        diff = after.compare_to(before, key_type)
+        profile.total = sum(stat.size_diff for stat in diff)
+        for stat in diff[:limit]:
+            if stat.size_diff or stat.count_diff:
+                frame = stat.traceback[0]
+                profile.stats.append({'where': f'{frame.filename}:{frame.lineno}',
+                                      'bytes': stat.size_diff, 'blocks': stat.count_diff})
+
+
+def bench_deep_sizeof(n=10**5):
+    'Build one of each kind of collection, then time and print a full memory report.'
+    import collections
+    import random
+    rng = random.Random(0)
+    words = [f'w{rng.randrange(n)}' for _ in range(n)]
+    Point = collections.namedtuple('Point', 'x y')
+    keep = [
+        collections.deque(words),
+        collections.Counter(words),
+        collections.OrderedDict.fromkeys(words),
+        collections.defaultdict(list, {w: [w] for w in words[:n // 10]}),
+        [Point(float(i), [i]) for i in range(n // 10)],
+    ]
+    for module_name, name, make in (
+            ('list', 'SortedList', lambda cls: cls(words)),
+            ('list', 'TypedList', lambda cls: cls('q', range(n))),
+            ('dict', 'FrozenDict', lambda cls: cls(dict.fromkeys(words, 1))),
+            ('Counter', 'RankedCounter', lambda cls: cls(words))):
+        try:
+            keep.append(make(getattr(importlib.import_module(module_name), name)))
+        except (ImportError, AttributeError):
+            pass
+    t0 = time.perf_counter()
+    report = memory_report()
+    elapsed = time.perf_counter() - t0
+    print(report.format())
+    print(f'memory_report() walked {sum(g["objects"] for g in report.groups.values()):,} '
+          f'collections in {elapsed:.2f} s')
+    del keep
+
+
+if __name__ == '__main__':
+    bench_deep_sizeof()
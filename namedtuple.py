@@ -41,4 +41,641 @@ p.x + p.y               # fields also accessible by name
 33
 p                       # readable __repr__ with a name=value style
 Point(x=11, y=22)
-'''
\ No newline at end of file
+'''
+'''
+namedtuple (fast, cached)
+A drop-in replacement for collections.namedtuple with the same signature,
+validation, rename and defaults behaviour, for modules that define many record
+types at import time. Class creation is faster for two reasons:
+
+- collections.namedtuple compiles the source of __new__ for each class with
+  eval(). Here the code object is compiled once per number of fields, and its
+  argument names are swapped in with CodeType.replace().
+- _make, _replace, _asdict and __getnewargs__ are shared by every class
+  instead of being created for each one. __repr__ is shared as well and reads
+  a format string stored on the class.
+
+Identical definitions are cached. A second call with the same typename, field
+names, rename flag, defaults and module returns the class created by the
+first call, as long as that class is still alive: the cache holds classes
+weakly, so classes created on the fly are freed like any other. Only definitions whose
+defaults are all None, bool, int, float, complex, str or bytes are cached, and
+those are compared by type and repr, so defaults=(False,) and defaults=(0,)
+give different classes. Definitions with other defaults, such as tuples or
+lists, always build a new class. Pickling works as usual: the class is still
+found by typename in its module.
+
+Two visible differences from collections.namedtuple remain. The shared
+methods have the __qualname__ of the shared function rather than
+'<typename>.<method>', and repeated identical definitions return the same
+class rather than equal but distinct classes.
+
+>>> Point = namedtuple('Point', 'x y', defaults=(0,))
+>>> Point(11)
+Point(x=11, y=0)
+>>> Point is namedtuple('Point', ['x', 'y'], defaults=[0])
+True
+'''
+
+import array
+import itertools
+import operator
+import struct
+import sys
+import time
+import weakref
+from keyword import iskeyword as _iskeyword
+from operator import itemgetter as _itemgetter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from _collections import _tuplegetter
+except ImportError:
+    _tuplegetter = lambda index, doc: property(_itemgetter(index), doc=doc)
+
+_tuple_new = tuple.__new__
+_new_templates = {}         # number of fields -> code object of __new__
+_class_cache = weakref.WeakValueDictionary()     # definition -> class
+_SCALARS = frozenset((type(None), bool, int, float, complex, str, bytes))
+_new_namespace = {'_tuple_new': _tuple_new, '__builtins__': {}}
+
+
+def _new_code(field_names):
+    'Return the code of __new__ for field_names, compiling once per arity.'
+    n = len(field_names)
+    template = _new_templates.get(n)
+    if template is None:
+        args = ', '.join(f'_{i}' for i in range(n))
+        source = f'lambda _cls, {args}: _tuple_new(_cls, ({args}{"," if n == 1 else ""}))'
+        template = _new_templates[n] = compile(source, '<namedtuple>', 'eval').co_consts[0]
+    return template.replace(co_varnames=('_cls', *field_names), co_name='__new__')
+
+
+@classmethod
+def _make(cls, iterable):
+    result = _tuple_new(cls, iterable)
+    if len(result) != len(cls._fields):
+        raise TypeError(f'Expected {len(cls._fields)} arguments, got {len(result)}')
+    return result
+
+
+def _replace(self, /, **kwds):
+    'Return a new object replacing specified fields with new values'
+    result = self._make(map(kwds.pop, self._fields, self))
+    if kwds:
+        raise ValueError(f'Got unexpected field names: {list(kwds)!r}')
+    return result
+
+
+def _repr(self):
+    'Return a nicely formatted representation string'
+    return self.__class__.__name__ + self._repr_fmt % self
+
+
+def _asdict(self):
+    'Return a new dict which maps field names to their values.'
+    return dict(zip(self._fields, self))
+
+
+def _getnewargs(self):
+    'Return self as a plain tuple.  Used by copy and pickle.'
+    return tuple(self)
+
+
+def _validate(typename, field_names, rename, defaults):
+    'Apply the collections.namedtuple rules; return (typename, fields, defaults).'
+    if isinstance(field_names, str):
+        field_names = field_names.replace(',', ' ').split()
+    field_names = list(map(str, field_names))
+    typename = sys.intern(str(typename))
+
+    if rename:
+        seen = set()
+        for index, name in enumerate(field_names):
+            if (not name.isidentifier() or _iskeyword(name)
+                    or name.startswith('_') or name in seen):
+                field_names[index] = f'_{index}'
+            seen.add(name)
+
+    for name in [typename] + field_names:
+        if type(name) is not str:
+            raise TypeError('Type names and field names must be strings')
+        if not name.isidentifier():
+            raise ValueError('Type names and field names must be valid '
+                             f'identifiers: {name!r}')
+        if _iskeyword(name):
+            raise ValueError('Type names and field names cannot be a '
+                             f'keyword: {name!r}')
+
+    seen = set()
+    for name in field_names:
+        if name.startswith('_') and not rename:
+            raise ValueError('Field names cannot start with an underscore: '
+                             f'{name!r}')
+        if name in seen:
+            raise ValueError(f'Encountered duplicate field name: {name!r}')
+        seen.add(name)
+
+    if defaults is not None:
+        defaults = tuple(defaults)
+        if len(defaults) > len(field_names):
+            raise TypeError('Got more default values than field names')
+    return typename, tuple(map(sys.intern, field_names)), defaults
+
+
+def _build(typename, field_names, defaults, module):
+    field_defaults = {}
+    if defaults is not None:
+        field_defaults = dict(reversed(list(zip(reversed(field_names),
+                                                reversed(defaults)))))
+    arg_list = ', '.join(field_names)
+    if len(field_names) == 1:
+        arg_list += ','
+    __new__ = type(_getnewargs)(_new_code(field_names), _new_namespace, '__new__', defaults)
+    __new__.__doc__ = f'Create new instance of {typename}({arg_list})'
+    __new__.__qualname__ = f'{typename}.__new__'
+    class_namespace = {
+        '__doc__': f'{typename}({arg_list})',
+        '__slots__': (),
+        '_fields': field_names,
+        '_field_defaults': field_defaults,
+        '_repr_fmt': '(' + ', '.join(f'{name}=%r' for name in field_names) + ')',
+        '__new__': __new__,
+        '_make': _make,
+        '_replace': _replace,
+        '__repr__': _repr,
+        '_asdict': _asdict,
+        '__getnewargs__': _getnewargs,
+        '__match_args__': field_names,
+        '__module__': module,
+    }
+    for index, name in enumerate(field_names):
+        class_namespace[name] = _tuplegetter(index, sys.intern(f'Alias for field number {index}'))
+    return type(typename, (tuple,), class_namespace)
+
+
+def namedtuple(typename, field_names, *, rename=False, defaults=None, module=None):
+    """Returns a new subclass of tuple with named fields.
+
+    Same interface as collections.namedtuple; identical definitions return the
+    same cached class.
+    """
+    if module is None:
+        try:
+            module = sys._getframe(1).f_globals.get('__name__', '__main__')
+        except (AttributeError, ValueError):
+            module = '__main__'
+    if isinstance(field_names, str):
+        spec = tuple(field_names.replace(',', ' ').split())
+    else:
+        spec = field_names = tuple(field_names)
+    key_defaults = None
+    if defaults is not None:
+        defaults = tuple(defaults)
+        if all(type(value) in _SCALARS for value in defaults):
+            # repr() tells apart defaults that compare equal, like 0.0 and -0.0.
+            key_defaults = tuple((type(value), repr(value)) for value in defaults)
+    if defaults is not None and key_defaults is None:
+        key = cls = None
+    else:
+        key = (typename, spec, rename, key_defaults, module)
+        try:
+            cls = _class_cache.get(key)
+        except TypeError:       # unhashable field names
+            key = cls = None
+    if cls is not None:
+        return cls
+    typename, field_names, defaults = _validate(typename, field_names, rename, defaults)
+    cls = _build(typename, field_names, defaults, module)
+    if key is not None:
+        _class_cache[key] = cls
+    return cls
+
+
+'''
+RecordBatch
+A list of 10**7 named tuples holds one tuple plus one boxed object per field for
+every row. RecordBatch stores rows of any namedtuple class column by column
+instead: each int or float field becomes one contiguous array.array column,
+and any other field becomes a list column. A row is only turned back into a
+named tuple when it is indexed or iterated.
+
+RecordBatch.from_records(cls, records, typecodes=None) builds a batch. The
+typecode of each column is taken from typecodes (a dict of field name to
+array typecode) or inferred from the first row: 'q' for int, 'd' for float, a
+list for anything else. to_records() converts back to a list of cls instances.
+
+column(name) returns a whole column. where(name, op, value) keeps the rows
+for which op(column value, value) is true. op is an operator function such
+as operator.gt, or its name ('lt', 'le', 'eq', 'ne', 'ge', 'gt').
+sort_by(name, reverse=False) returns the rows ordered by one column, and
+take(indices) returns the rows at the given positions. With NumPy installed,
+where() and sort_by() on typed columns are vectorized. sort_by() is stable.
+
+Slicing with step 1, batch[i:j], copies nothing for typed columns: the new batch
+holds memoryview windows onto the parent's arrays. List columns are sliced
+normally. While such a slice exists, appending to the parent raises
+BufferError, as for any array with exported buffers.
+
+>>> Trade = namedtuple('Trade', 'sym price qty')
+>>> batch = RecordBatch.from_records(Trade, [Trade('A', 9.5, 100), Trade('B', 3.0, 7)])
+>>> batch[1]
+Trade(sym='B', price=3.0, qty=7)
+>>> batch.where('qty', 'gt', 50).to_records()
+[Trade(sym='A', price=9.5, qty=100)]
+'''
+
+
+def _infer_typecode(value):
+    if type(value) is float:
+        return 'd'
+    if type(value) is int:
+        return 'q'
+    return None
+
+
+class RecordBatch:
+    'Columnar (struct-of-arrays) storage for rows of a namedtuple class.'
+
+    def __init__(self, cls, columns):
+        if len(columns) != len(cls._fields):
+            raise ValueError(f'expected {len(cls._fields)} columns, got {len(columns)}')
+        lengths = {len(column) for column in columns}
+        if len(lengths) > 1:
+            raise ValueError('columns must all have the same length')
+        self.cls = cls
+        self._columns = list(columns)
+        self._len = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_records(cls, record_cls, records, typecodes=None):
+        records = iter(records)
+        first = next(records, None)
+        typecodes = dict(typecodes or {})
+        columns = []
+        for index, name in enumerate(record_cls._fields):
+            code = typecodes.get(name)
+            if code is None and first is not None:
+                code = _infer_typecode(first[index])
+            columns.append(array.array(code) if code else [])
+        batch = cls(record_cls, columns)
+        if first is not None:
+            batch.extend(itertools.chain((first,), records))
+        return batch
+
+    def append(self, record):
+        if len(record) != len(self._columns):
+            raise TypeError(f'Expected {len(self._columns)} arguments, got {len(record)}')
+        try:
+            for column, value in zip(self._columns, record):
+                column.append(value)
+        except BaseException:
+            # Undo the fields already appended, so the columns stay aligned.
+            for column in self._columns:
+                del column[self._len:]
+            raise
+        self._len += 1
+
+    def extend(self, records):
+        for record in records:
+            try:
+                self.append(record)
+            except (TypeError, OverflowError):
+                self._widen(record)
+                self.append(record)
+
+    def _widen(self, record):
+        'Turn typed columns that cannot hold a value of record into lists.'
+        for index, (column, value) in enumerate(zip(self._columns, record)):
+            if isinstance(column, array.array):
+                try:
+                    array.array(column.typecode, [value])
+                except (TypeError, OverflowError):
+                    self._columns[index] = column.tolist()
+        for index, column in enumerate(self._columns):
+            del column[self._len:]
+
+    def to_records(self):
+        return list(self)
+
+    def column(self, name):
+        return self._columns[self.cls._fields.index(name)]
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return map(self.cls._make, zip(*self._columns))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step == 1:
+                return type(self)(self.cls, [
+                    memoryview(c)[start:stop] if not isinstance(c, list) else c[start:stop]
+                    for c in self._columns])
+            return self.take(range(start, stop, step))
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('RecordBatch index out of range')
+        return self.cls._make([column[index] for column in self._columns])
+
+    def take(self, indices):
+        'Return a new batch with the rows at the given positions.'
+        if np is not None and not isinstance(indices, (range, list)):
+            indices = np.asarray(indices)
+        columns = []
+        for column in self._columns:
+            if np is not None and not isinstance(column, list) and len(column):
+                gathered = np.asarray(column)[np.asarray(indices, dtype=np.intp)]
+                columns.append(array.array(_typecode(column), gathered.tobytes()))
+            else:
+                getter = column.__getitem__
+                values = list(map(getter, indices))
+                columns.append(array.array(_typecode(column), values)
+                               if not isinstance(column, list) else values)
+        return type(self)(self.cls, columns)
+
+    def where(self, name, op, value):
+        'Return the rows for which op(row.<name>, value) is true.'
+        if isinstance(op, str):
+            op = getattr(operator, op)
+        column = self.column(name)
+        if np is not None and not isinstance(column, list) and len(column):
+            mask = op(np.asarray(column), value)
+            return self.take(np.flatnonzero(mask))
+        return self.take([i for i, v in enumerate(column) if op(v, value)])
+
+    def sort_by(self, name, reverse=False):
+        'Return the rows ordered by one column; equal values keep their order.'
+        column = self.column(name)
+        if np is not None and not isinstance(column, list) and len(column):
+            values = np.asarray(column)
+            if reverse:
+                # Sort the reversed column and map back, so ties keep their order.
+                order = len(values) - 1 - np.argsort(values[::-1], kind='stable')[::-1]
+            else:
+                order = np.argsort(values, kind='stable')
+            return self.take(order)
+        return self.take(sorted(range(self._len), key=column.__getitem__, reverse=reverse))
+
+    def __sizeof__(self):
+        size = object.__sizeof__(self) + sys.getsizeof(self._columns)
+        for column in self._columns:
+            size += sys.getsizeof(column)
+            if isinstance(column, list):
+                size += sum(map(sys.getsizeof, column))
+        return size
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.cls.__name__}, rows={self._len})'
+
+
+def _typecode(column):
+    'Return the array typecode of an array or of a memoryview onto one.'
+    if isinstance(column, memoryview):
+        return column.format
+    return column.typecode
+
+
+'''
+structtuple
+structtuple(typename, fields, *, byteorder='<', module=None) is the namedtuple
+factory for fixed-layout binary records. Each field has a type as well as a name:
+
+    Packet = structtuple('Packet', 'src:uint32 dst:uint32 ttl:uint8 tag:4s')
+
+Types are int8, uint8, int16, uint16, int32, uint32, int64, uint64, float32,
+float64, bool, char, or Ns for a fixed-length bytes field of N bytes
+(bytesN is also accepted). fields may also be a list of (name, type) pairs.
+byteorder is a struct byte order character: '<', '>', '!' or '=' for packed
+standard sizes, or '@' for native sizes and alignment.
+
+The result is a regular named tuple class, built by namedtuple() above, plus:
+
+_struct                      the struct.Struct of one record
+_offsets                     the byte offset of each field
+unpack_from(buffer, offset)  decode one record into a new instance (copies)
+iter_unpack(buffer)          decode every record in buffer (copies, C speed)
+pack(), pack_into(...)       encode an instance
+view(buffer, offset)         a zero-copy view of one record
+iter_views(buffer)           zero-copy views of every record in buffer
+
+These names and View can't be used as field names; structtuple() raises
+ValueError for them.
+
+A view (an instance of Packet.View) overlays bytes, bytearray, memoryview, mmap
+or any other buffer without copying. Each attribute read decodes just that
+field. On a writable buffer, assigning to an attribute encodes the value in
+place. view._astuple() decodes the whole record into a Packet.
+
+>>> Packet = structtuple('Packet', 'src:uint32 ttl:uint8 tag:2s')
+>>> buf = bytearray(Packet(1, 64, b'ok').pack() * 2)
+>>> v = Packet.view(buf, Packet._struct.size)
+>>> v.ttl
+64
+>>> v.ttl = 1
+>>> list(Packet.iter_unpack(buf))
+[Packet(src=1, ttl=64, tag=b'ok'), Packet(src=1, ttl=1, tag=b'ok')]
+'''
+
+_FIELD_TYPES = {
+    'int8': 'b', 'uint8': 'B', 'int16': 'h', 'uint16': 'H',
+    'int32': 'i', 'uint32': 'I', 'int64': 'q', 'uint64': 'Q',
+    'float32': 'f', 'float64': 'd', 'bool': '?', 'char': 'c',
+}
+
+
+_RECORD_ATTRIBUTES = frozenset(('unpack_from', 'iter_unpack', 'pack', 'pack_into', 'view',
+                                'iter_views', 'View'))
+
+
+def _field_code(type_name):
+    code = _FIELD_TYPES.get(type_name)
+    if code is not None:
+        return code
+    length = type_name[5:] if type_name.startswith('bytes') else type_name[:-1]
+    if (type_name.endswith('s') or type_name.startswith('bytes')) and length.isdigit():
+        return f'{int(length)}s'
+    raise ValueError(f'Unknown field type: {type_name!r}')
+
+
+class _RecordView:
+    'Zero-copy view of one binary record; subclassed per structtuple.'
+
+    __slots__ = ('_buffer', '_offset')
+
+    def __init__(self, buffer, offset=0):
+        buffer = memoryview(buffer).cast('B')
+        if offset < 0 or offset + self._record._struct.size > len(buffer):
+            raise IndexError('record does not fit in the buffer')
+        self._buffer = buffer
+        self._offset = offset
+
+    def _astuple(self):
+        return self._record.unpack_from(self._buffer, self._offset)
+
+    def __repr__(self):
+        return f'{type(self).__qualname__}{repr(self._astuple())[len(self._record.__name__):]}'
+
+
+def _view_field(code, offset, byteorder):
+    field = struct.Struct(byteorder + code)
+
+    def get(self):
+        return field.unpack_from(self._buffer, self._offset + offset)[0]
+
+    def set(self, value):
+        if self._buffer.readonly:
+            raise TypeError('cannot write to a read-only buffer')
+        field.pack_into(self._buffer, self._offset + offset, value)
+
+    return property(get, set)
+
+
+@classmethod
+def _unpack_from(cls, buffer, offset=0):
+    return cls._make(cls._struct.unpack_from(buffer, offset))
+
+
+@classmethod
+def _iter_unpack(cls, buffer):
+    return map(cls._make, cls._struct.iter_unpack(buffer))
+
+
+def _pack(self):
+    return self._struct.pack(*self)
+
+
+def _pack_into(self, buffer, offset=0):
+    self._struct.pack_into(buffer, offset, *self)
+
+
+@classmethod
+def _view(cls, buffer, offset=0):
+    return cls.View(buffer, offset)
+
+
+@classmethod
+def _iter_views(cls, buffer):
+    buffer = memoryview(buffer).cast('B')
+    size = cls._struct.size
+    View = cls.View
+    return (View(buffer, offset) for offset in range(0, len(buffer) - size + 1, size))
+
+
+def structtuple(typename, fields, *, byteorder='<', module=None):
+    'Return a named tuple class for a fixed binary layout, with zero-copy views.'
+    if byteorder not in '<>!=@' or len(byteorder) != 1:
+        raise ValueError(f'Invalid byte order: {byteorder!r}')
+    if isinstance(fields, str):
+        fields = [field.split(':', 1) for field in fields.replace(',', ' ').split()]
+    names, codes = [], []
+    for field in fields:
+        if len(field) != 2:
+            raise ValueError(f'Fields must be declared as name:type, got {field!r}')
+        if field[0] in _RECORD_ATTRIBUTES:
+            raise ValueError(f'Field name conflicts with a structtuple attribute: {field[0]!r}')
+        names.append(field[0])
+        codes.append(_field_code(field[1]))
+    if module is None:
+        try:
+            module = sys._getframe(1).f_globals.get('__name__', '__main__')
+        except (AttributeError, ValueError):
+            module = '__main__'
+    cls = namedtuple(typename, names, module=module)
+    # A cached namedtuple class may be shared with an untyped definition, so
+    # derive a subclass that carries the layout.
+    layout = struct.Struct(byteorder + ''.join(codes))
+    offsets = tuple(struct.calcsize(byteorder + ''.join(codes[:i + 1])) - struct.calcsize(byteorder + code)
+                    for i, code in enumerate(codes))
+    record = type(typename, (cls,), {
+        '__slots__': (),
+        '__module__': module,
+        '__doc__': cls.__doc__,
+        '_struct': layout,
+        '_offsets': offsets,
+        'unpack_from': _unpack_from,
+        'iter_unpack': _iter_unpack,
+        'pack': _pack,
+        'pack_into': _pack_into,
+        'view': _view,
+        'iter_views': _iter_views,
+    })
+    view_namespace = {'__slots__': (), '_record': record, '__module__': module}
+    for name, code, offset in zip(names, codes, offsets):
+        view_namespace[name] = _view_field(code, offset, byteorder)
+    record.View = type('View', (_RecordView,), view_namespace)
+    record.View.__qualname__ = f'{typename}.View'
+    return record
+
+
+def bench_startup(types=500, fields=6):
+    'Time importing a module that defines many record types, in a fresh interpreter.'
+    import os
+    import subprocess
+    import tempfile
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, factory in (('stdlib', 'from collections import namedtuple'),
+                              ('cached', 'from namedtuple import namedtuple')):
+            lines = [factory]
+            for i in range(types):
+                names = ' '.join(f'f{i}_{j}' for j in range(fields))
+                lines.append(f"R{i} = namedtuple('R{i}', '{names}', defaults=(None,))")
+            with open(os.path.join(tmp, f'records_{name}.py'), 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+            probe = ('import time, namedtuple; t = time.perf_counter(); '
+                     f'import records_{name}; print(time.perf_counter() - t)')
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join([tmp, here]),
+                       PYTHONDONTWRITEBYTECODE='1')
+            runs = [float(subprocess.check_output([sys.executable, '-c', probe], env=env))
+                    for _ in range(5)]
+            print(f'{name:>7}: import of {types} record types {min(runs) * 1e3:7.1f} ms')
+
+
+def bench_record_batch(rows=10**6):
+    'Compare memory and a filtered scan on a list of tuples and a RecordBatch.'
+    import random
+    import tracemalloc
+    Trade = namedtuple('Trade', 'id price qty')
+    rng = random.Random(0)
+    tracemalloc.start()
+    records = [Trade(i, rng.random() * 100, rng.randrange(10)) for i in range(rows)]
+    list_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    batch = RecordBatch.from_records(Trade, records)
+    batch_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    sum(r.price for r in records if r.qty > 5)
+    t1 = time.perf_counter()
+    sum(batch.where('qty', 'gt', 5).column('price'))
+    t2 = time.perf_counter()
+    print(f'list of namedtuples: {list_bytes / rows:6.1f} bytes/row  scan {(t1 - t0) * 1e3:8.1f} ms')
+    print(f'RecordBatch:         {batch_bytes / rows:6.1f} bytes/row  scan {(t2 - t1) * 1e3:8.1f} ms')
+
+
+def bench_structtuple(records=10**6):
+    'Compare decoding every record with reading one field through views.'
+    Row = structtuple('Row', 'ts:float64 id:uint32 flags:uint16 tag:6s')
+    buf = bytearray(Row(1.5, 7, 3, b'abcdef').pack() * records)
+    t0 = time.perf_counter()
+    sum(row.id for row in Row.iter_unpack(buf))
+    t1 = time.perf_counter()
+    sum(view.id for view in Row.iter_views(buf))
+    t2 = time.perf_counter()
+    print(f'iter_unpack (decode all fields) {(t1 - t0) * 1e3:8.1f} ms')
+    print(f'iter_views (decode one field)   {(t2 - t1) * 1e3:8.1f} ms, no copies')
+
+
+if __name__ == '__main__':
+    bench_startup()
+    bench_record_batch()
+    bench_structtuple()